@@ -1,4 +1,5 @@
 import os
+import sys
 import logging
 from flask import Flask
 from dotenv import load_dotenv
@@ -47,17 +48,22 @@ db.init_app(app)
 # Importando os blueprints das rotas
 from routes.dashboard import dashboard_bp
 from routes.api import api_bp
+from routes.websub import websub_bp
 
 # Registrando os blueprints na aplicação Flask
 app.register_blueprint(dashboard_bp)
 app.register_blueprint(api_bp, url_prefix='/api')
+app.register_blueprint(websub_bp, url_prefix='/websub')
  
 # Importando e registrando os comandos CLI
 from commands import register_commands
 register_commands(app)
  
+# Processos do multiprocessing (pool de parsing) reexecutam o script principal como __mp_main__; o agendador fica só no processo da app
+is_worker_process = getattr(sys.modules.get('__mp_main__'), '__name__', None) == '__mp_main__'
+
 # Inicializando o agendador de tarefas
-if not app.debug or os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+if not is_worker_process and (not app.debug or os.environ.get('WERKZEUG_RUN_MAIN') == 'true'):
     from services.scheduler import init_scheduler
     init_scheduler()
     logger.info("Scheduler initialized.")
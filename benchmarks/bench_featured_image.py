@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: featured image extraction from RSS entry summaries.
+
+Compares the previous BeautifulSoup implementation with the streaming
+extractor in services/extraction.py. By default it runs on the bundled
+sample in the Screen Rant feed format; pass saved feeds to benchmark real
+entries:
+
+    curl -o movie-news.xml https://screenrant.com/feed/movie-news/
+    python benchmarks/bench_featured_image.py movie-news.xml
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import feedparser
+from bs4 import BeautifulSoup
+from services.extraction import extract_summary_image, has_image_extension
+
+DEFAULT_FEED = os.path.join(os.path.dirname(__file__), 'fixtures', 'screenrant_movie_news_sample.xml')
+VALID_EXTENSIONS = ['.jpg', '.jpeg', '.png', '.webp', '.gif']
+
+
+def legacy_summary_image(summary_html):
+    """Implementation used by RSSMonitor._extract_featured_image before the fast path"""
+    soup = BeautifulSoup(summary_html, 'html.parser')
+    img_tag = soup.find('img')
+    if img_tag and img_tag.get('src'):
+        image_url = img_tag.get('src')
+        if any(ext in image_url.lower() for ext in VALID_EXTENSIONS):
+            return image_url
+    return None
+
+
+def fast_summary_image(summary_html):
+    image_url = extract_summary_image(summary_html)
+    if image_url and has_image_extension(image_url):
+        return image_url
+    return None
+
+
+def main(paths):
+    summaries = []
+    for path in paths:
+        feed = feedparser.parse(path)
+        summaries.extend(entry.summary for entry in feed.entries if entry.get('summary'))
+
+    if not summaries:
+        print("No entries with a summary found")
+        return 1
+
+    found_legacy = sum(1 for s in summaries if legacy_summary_image(s))
+    found_fast = sum(1 for s in summaries if fast_summary_image(s))
+
+    number = 200
+    legacy = timeit.timeit(lambda: [legacy_summary_image(s) for s in summaries], number=number)
+    fast = timeit.timeit(lambda: [fast_summary_image(s) for s in summaries], number=number)
+    per_entry = 1e6 / (number * len(summaries))
+
+    print(f"Entries: {len(summaries)} (images found: legacy={found_legacy}, fast={found_fast})")
+    print(f"BeautifulSoup: {legacy * per_entry:8.1f} us/entry")
+    print(f"Streaming:     {fast * per_entry:8.1f} us/entry")
+    print(f"Speedup:       {legacy / fast:8.1f}x")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:] or [DEFAULT_FEED]))
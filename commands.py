@@ -1,16 +1,45 @@
 import click
 from flask.cli import with_appcontext
 from app import db
-from services.scheduler import check_and_process_feeds
+from services.scheduler import ContentAutomationScheduler, get_scheduler
 
 def register_commands(app):
     @app.cli.command("init-db")
     @with_appcontext
     def init_db_command():
-        """Cria as tabelas do banco de dados."""
+        """Cria as tabelas do banco de dados e adiciona colunas novas às tabelas existentes."""
         import models  # Importa os modelos para garantir que sejam registrados
+        from services.rss_monitor import RSSMonitor
+        from services.schema import add_missing_columns
         db.create_all()
-        click.echo("Banco de dados inicializado.")
+        columns = add_missing_columns()
+        if columns:
+            click.echo(f"Colunas adicionadas: {', '.join(columns)}")
+        added = RSSMonitor().seed_feeds()
+        click.echo(f"Banco de dados inicializado ({added} feeds cadastrados).")
+
+    @app.cli.command("add-feed")
+    @click.argument("feed_type")
+    @click.argument("url")
+    @with_appcontext
+    def add_feed_command(feed_type, url):
+        """Cadastra (ou reativa) um feed RSS na tabela de feeds."""
+        from models import Feed
+        from config import SCHEDULE_CONFIG
+        feed = Feed.query.filter_by(feed_type=feed_type).first()
+        if feed:
+            if feed.url != url:
+                feed.url = url
+                feed.etag = None
+                feed.last_modified = None
+            feed.enabled = True
+        else:
+            db.session.add(Feed(
+                feed_type=feed_type, url=url, enabled=True, fetch_count=0, not_modified_count=0,
+                backlog_pending=False, poll_interval=SCHEDULE_CONFIG['check_interval']
+            ))
+        db.session.commit()
+        click.echo(f"Feed '{feed_type}' cadastrado: {url}")
 
     @app.cli.command("run-task")
     @with_appcontext
@@ -18,7 +47,8 @@ def register_commands(app):
         """Executa a tarefa de verificação de feeds manualmente."""
         click.echo("Iniciando a tarefa de verificação de feeds...")
         try:
-            check_and_process_feeds()
+            # Busca todos os feeds, processa com IA e publica (mesmo ciclo do botão "executar agora")
+            (get_scheduler() or ContentAutomationScheduler()).execute_now()
             click.echo("Tarefa concluída com sucesso.")
         except Exception as e:
             click.echo(f"Erro ao executar a tarefa: {e}")
\ No newline at end of file
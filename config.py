@@ -1,6 +1,6 @@
 import os
 
-# RSS Feeds Configuration
+# RSS Feeds (seed for the feeds table; manage feeds there after 'flask init-db')
 RSS_FEEDS = {
     'movies': 'https://screenrant.com/feed/movie-news/',
     'tv-shows': 'https://screenrant.com/feed/tv-news/'
@@ -9,8 +9,112 @@ RSS_FEEDS = {
 # User Agent for requests
 USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
 
+# WebSub (PubSubHubbub) push subscriptions; feeds without a hub keep being polled
+WEBSUB_CONFIG = {
+    'enabled': os.getenv('WEBSUB_ENABLED', 'false').lower() == 'true',
+    'callback_base_url': os.getenv('PUBLIC_BASE_URL', ''),  # URL pública da aplicação (callback do hub)
+    'secret': os.getenv('WEBSUB_SECRET', ''),  # obrigatório: sem ele pushes são recusados e não há inscrição
+    'lease_seconds': 5 * 24 * 3600,  # também o máximo aceito na verificação do hub
+    'verify_timeout': 3600  # segundos: verificações do hub só valem até esse tempo após o pedido
+}
+
+# Shared HTTP client for article downloads
+HTTP_CONFIG = {
+    'pool_connections': 4,  # hosts distintos mantidos no pool
+    'pool_maxsize': 8,  # conexões keep-alive por host (acompanhar fetch_concurrency)
+    'connect_timeout': 5,  # seconds
+    'read_timeout': 20,  # seconds
+    'retries': 3,
+    'backoff_factor': 0.5  # 0.5s, 1s, 2s entre tentativas
+}
+
+# On-disk cache of raw article HTML (gzip)
+HTML_CACHE_CONFIG = {
+    'enabled': True,
+    'directory': os.getenv('HTML_CACHE_DIR', 'cache/html'),
+    'max_size_mb': 500
+}
+
+# Cache persistente das respostas da IA (evita pagar de novo por artigos reprocessados/repetidos)
+AI_CACHE_CONFIG = {
+    'enabled': True,
+    'directory': os.getenv('AI_CACHE_DIR', 'cache/ai'),
+    'ttl_hours': 168,
+    'max_size_mb': 50
+}
+
 # AI Configuration with multiple keys for fallback
 AI_CONFIG = {
+    'model': 'gemini-2.5-flash',
+    'max_concurrency_per_key': 4,  # chamadas simultâneas por chave de API
+    # Limites por chave (token bucket); sobrescreva por chave, ex.: 'cinema_backup': {'weight': 0.5}
+    'rate_limits': {
+        'default': {'requests_per_minute': 10, 'tokens_per_minute': 250000, 'weight': 1.0}
+    },
+    'cross_pool_fallback': True,  # usa as chaves de 'series' quando as de 'cinema' esgotam (e vice-versa)
+    'max_quota_wait': 60,  # seconds esperando cota antes de adiar o artigo para o próximo ciclo
+    'expected_output_tokens': 2048,  # estimativa de saída usada para reservar tokens
+    # Roteamento de modelo por tamanho/feed: a primeira rota que casar vence (feeds, min_tokens, max_tokens).
+    # Rota com p95 ou taxa de falha acima do limite é rebaixada para a rota 'fallback' por demote_seconds.
+    'model_routing': {
+        'enabled': os.getenv('AI_ROUTING_ENABLED', 'false').lower() == 'true',
+        'routes': [
+            {'name': 'light', 'model': 'gemini-2.5-flash-lite', 'max_tokens': 350, 'fallback': 'standard'},
+            {'name': 'standard', 'model': 'gemini-2.5-flash'}
+        ],
+        'p95_latency_limit': 45,  # segundos
+        'max_failure_rate': 0.25,
+        'min_samples': 20,
+        'demote_seconds': 900
+    },
+    # Compactação do conteúdo antes do prompt (remove boilerplate e corta em fim de frase)
+    'compaction': {
+        'enabled': True,
+        'max_input_tokens': 1000
+    },
+    # Empacotamento: vários artigos curtos no mesmo pedido (útil quando o limite é por requisição)
+    'packing': {
+        'enabled': os.getenv('AI_PACKING_ENABLED', 'false').lower() == 'true',
+        'short_article_tokens': 400,  # só artigos até esse tamanho entram em pacotes
+        'pack_token_budget': 1600,  # soma de conteúdo por pacote
+        'max_articles_per_pack': 5
+    },
+    # Retentativas para erros transitórios (429, 5xx, timeouts) com backoff exponencial e jitter
+    'retry': {
+        'max_retries': 4,
+        'base_delay': 2,  # segundos
+        'max_delay': 60,
+        'request_timeout': 90,  # timeout de cada chamada
+        'article_time_budget': 240  # tempo máximo gasto em um artigo antes de devolvê-lo à fila
+    },
+    # Modo lote (Batch API) para backlogs grandes: mais barato, porém assíncrono
+    'batch': {
+        'enabled': os.getenv('AI_BATCH_ENABLED', 'false').lower() == 'true',
+        'backend': 'gemini',  # 'gemini' ou 'fake' (lote simulado em memória, para testes)
+        'min_articles': 20,  # só usa lote quando há pelo menos isso de pendentes
+        'max_articles': 200  # por job
+    },
+    # Hedging: se a chave não responder até o percentil de latência recente, repete o pedido em outra chave
+    'hedging': {
+        'enabled': os.getenv('AI_HEDGING_ENABLED', 'false').lower() == 'true',
+        'percentile': 0.9,
+        'min_samples': 20,  # latências necessárias antes de ativar
+        'min_delay': 5  # segundos
+    },
+    # Cache de contexto do Gemini para as instruções fixas (UNIVERSAL_PROMPT)
+    'context_cache': {
+        'enabled': True,
+        'ttl_seconds': 3600
+    },
+    # Circuit breaker por chave: abre com muitos erros/lentidão e testa de novo após open_seconds
+    'circuit_breaker': {
+        'window': 20,  # últimas chamadas consideradas
+        'min_calls': 5,
+        'error_threshold': 0.5,
+        'slow_call_seconds': 60,
+        'slow_call_threshold': 0.8,
+        'open_seconds': 120
+    },
     'cinema': {
         'primary': os.getenv('GEMINI_API_KEY_MOVIE', ''),
         'backup': os.getenv('GEMINI_API_KEY_MOVIE_BACKUP', '')
@@ -40,14 +144,41 @@ WORDPRESS_CATEGORIES = {
 
 # Schedule Configuration
 SCHEDULE_CONFIG = {
-    'check_interval': 15,  # minutes
+    'check_interval': 15,  # minutes: ciclo de IA/publicação e intervalo inicial de cada feed
+    'poll_tick': 1,  # minutes: frequência com que os feeds vencidos são verificados (job próprio)
+    'min_poll_interval': 5,  # minutes
+    'max_poll_interval': 60,  # minutes
+    'poll_jitter': 0.15,  # variação aleatória (±15%) para espalhar as consultas
+    'target_entries_per_poll': 2,  # novas entradas esperadas por consulta ao ajustar o intervalo
+    'publish_rate_smoothing': 0.3,  # peso da última observação na taxa de publicação
     'max_articles_per_run': 5,  # aumentado para processar mais artigos
-    'cleanup_after_hours': 12
+    'cleanup_after_hours': 12,
+    'fetch_concurrency': 8,  # limite global de downloads simultâneos (feeds + artigos)
+    'seen_url_cache_size': 5000,  # URLs recentes mantidas em memória para deduplicação
+    'entries_per_feed': 3,  # novas entradas por feed em cada ciclo
+    'catchup_entries_per_feed': 10,  # entradas por feed em cada ciclo enquanto houver backlog
+    'max_entry_retries': 3,  # tentativas de extração por entrada antes de pulá-la (evita travar o feed)
+    'parse_workers': 2  # processos para parsing de HTML (0 = parsing no próprio processo)
 }
 
-# Universal Prompt for AI Processing
+# Database cleanup
+CLEANUP_CONFIG = {
+    'retention_hours': 24,  # artigos publicados/falhos/duplicados mais antigos que isso são removidos
+    'chunk_size': 500,  # linhas apagadas por transação
+    'archive_enabled': os.getenv('CLEANUP_ARCHIVE_ENABLED', 'false').lower() == 'true',
+    'archive_dir': os.getenv('CLEANUP_ARCHIVE_DIR', 'archive')  # arquivos .ndjson.gz exportados antes de apagar
+}
+
+# Near-duplicate detection (SimHash over original_content)
+DEDUP_CONFIG = {
+    'simhash_max_distance': 3,  # bits de diferença para considerar duplicado (até 3 a busca usa os índices por faixa)
+    'window_hours': 72  # janela de artigos recentes usada na comparação
+}
+
+# Universal Prompt for AI Processing: instruções fixas, enviadas como system instruction
+# (e guardadas em cache de contexto no Gemini quando possível)
 UNIVERSAL_PROMPT = """
-Você é um redator especialista em cultura pop. Reescreva o seguinte artigo em português com SEO, parágrafos bem separados e otimize para o Google.
+Você é um redator especialista em cultura pop. Reescreva o artigo enviado em português com SEO, parágrafos bem separados e otimize para o Google.
 
 REGRAS:
 1. Traduza o artigo original para o português, mantendo todos os detalhes e a estrutura.
@@ -60,12 +191,8 @@ REGRAS:
 8. Se houver embeds de vídeos do YouTube ou publicações do Twitter, incorpore diretamente no local apropriado do conteúdo com o código embed real.
 9. Mantenha a coerência e a naturalidade do texto, como em uma publicação profissional de jornalismo de entretenimento.
 
-ARTIGO ORIGINAL:
-Título: {titulo}
-Conteúdo: {conteudo}
-
 Responda APENAS em JSON:
-{{
+{
   "titulo_final": "...",
   "conteudo_final": "...",
   "meta_description": "...",
@@ -73,5 +200,18 @@ Responda APENAS em JSON:
   "categoria": "...",
   "obra_principal": "...",
   "tags": ["...", "...", "..."]
-}}
+}
+"""
+
+# Parte variável do prompt, enviada a cada artigo
+ARTICLE_PROMPT = """
+ARTIGO ORIGINAL:
+Título: {titulo}
+Conteúdo: {conteudo}
+"""
+
+# Pedido com vários artigos curtos de uma vez (modo de empacotamento)
+PACKED_PROMPT = """
+Você receberá {quantidade} artigos. Aplique as regras a cada um separadamente e responda APENAS com um array JSON de {quantidade} objetos no formato indicado, na mesma ordem dos artigos. Cada objeto deve ter também o campo "artigo" com o número do ARTIGO a que corresponde.
+{artigos}
 """
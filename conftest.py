@@ -0,0 +1,19 @@
+import os
+import sys
+import tempfile
+
+# Banco SQLite temporário para a suíte inteira: precisa estar definido antes do primeiro "import app",
+# senão a app conecta no DATABASE_URL real (.env) ou no Postgres padrão
+db_fd, db_path = tempfile.mkstemp(suffix='.db')
+os.close(db_fd)
+os.environ['DATABASE_URL'] = f"sqlite:///{db_path}"
+
+
+def pytest_unconfigure(config):
+    """Remove o banco temporário ao final da suíte."""
+    if 'app' in sys.modules:
+        from app import db, app
+        with app.app_context():
+            db.engine.dispose()
+    if os.path.exists(db_path):
+        os.unlink(db_path)
@@ -1,6 +1,6 @@
 from app import db
 from datetime import datetime
-from sqlalchemy import Integer, String, Text, DateTime, Boolean
+from sqlalchemy import Integer, BigInteger, String, Text, DateTime, Boolean
 
 class Article(db.Model):
     __tablename__ = 'articles'
@@ -9,6 +9,12 @@ class Article(db.Model):
     original_url = db.Column(String(500), unique=True, nullable=False)
     original_title = db.Column(String(500), nullable=False)
     original_content = db.Column(Text, nullable=False)
+    content_simhash = db.Column(BigInteger)  # SimHash of original_content for near-duplicate detection
+    # 16-bit bands of content_simhash: near-duplicates share at least one, so lookups use these indexes
+    simhash_band0 = db.Column(Integer, index=True)
+    simhash_band1 = db.Column(Integer, index=True)
+    simhash_band2 = db.Column(Integer, index=True)
+    simhash_band3 = db.Column(Integer, index=True)
     
     # AI processed content
     titulo_final = db.Column(String(500))
@@ -28,8 +34,9 @@ class Article(db.Model):
     
     # Metadata
     feed_type = db.Column(String(50), nullable=False)
-    status = db.Column(String(50), default='pending')  # pending, processing, processed, published, failed
+    status = db.Column(String(50), default='pending')  # pending, processing, batching, processed, published, failed, duplicate
     ai_used = db.Column(String(100))
+    batch_job = db.Column(String(200), index=True)  # Gemini batch job while status == 'batching'
     processing_time = db.Column(Integer)  # seconds
     error_message = db.Column(Text)
     
@@ -54,3 +61,41 @@ class ProcessingLog(db.Model):
     
     def __repr__(self):
         return f'<ProcessingLog {self.id}: {self.action}>'
+
+class Feed(db.Model):
+    __tablename__ = 'feeds'
+
+    id = db.Column(Integer, primary_key=True)
+    feed_type = db.Column(String(50), unique=True, nullable=False)
+    url = db.Column(String(500), nullable=False)
+    enabled = db.Column(Boolean, default=True)
+
+    # Adaptive polling
+    poll_interval = db.Column(Integer)  # minutes
+    publish_rate = db.Column(db.Float)  # smoothed new entries per hour
+    next_poll_at = db.Column(DateTime, index=True)
+
+    # HTTP validators for conditional GET (ETag / Last-Modified)
+    etag = db.Column(String(200))
+    last_modified = db.Column(String(100))
+
+    # WebSub (PubSubHubbub) push subscription
+    hub_url = db.Column(String(500))
+    topic_url = db.Column(String(500))  # rel="self" URL advertised by the feed
+    websub_expires_at = db.Column(DateTime)
+    websub_pending_mode = db.Column(String(20))  # mode of the request awaiting the hub's verification
+    websub_requested_at = db.Column(DateTime)
+
+    # Cursor: newest entry already handed to the pipeline
+    last_entry_published_at = db.Column(DateTime)
+    last_entry_id = db.Column(String(500))
+    backlog_pending = db.Column(Boolean, default=False)  # catch-up mode: more entries past the cursor
+    entry_retries = db.Column(Text)  # JSON {entry_id: failed extraction attempts} for entries being retried
+
+    # Fetch statistics
+    fetch_count = db.Column(Integer, default=0)
+    not_modified_count = db.Column(Integer, default=0)
+    last_fetched_at = db.Column(DateTime)
+
+    def __repr__(self):
+        return f'<Feed {self.feed_type}: {self.url}>'
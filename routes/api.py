@@ -3,6 +3,7 @@ from flask import Blueprint, request, jsonify
 from services.scheduler import get_scheduler
 from services.wordpress_publisher import WordPressPublisher
 from services.ai_processor import AIProcessor
+from services.rss_monitor import RSSMonitor
 from models import Article, ProcessingLog
 from app import db
 import logging
@@ -52,6 +53,15 @@ def get_ai_status():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@api_bp.route('/feed-stats')
+def get_feed_stats():
+    """Get RSS feed fetch statistics"""
+    try:
+        rss_monitor = RSSMonitor()
+        return jsonify(rss_monitor.get_feed_stats())
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @api_bp.route('/scheduler-status')
 def get_scheduler_status():
     """Get scheduler status"""
@@ -0,0 +1,75 @@
+import logging
+import threading
+import feedparser
+from flask import Blueprint, request
+from app import app, db
+from models import Feed
+from services.scheduler import get_scheduler
+from services.rss_monitor import RSSMonitor
+from services.websub import accept_verification, push_enabled, verify_signature
+
+logger = logging.getLogger(__name__)
+websub_bp = Blueprint('websub', __name__)
+
+@websub_bp.route('/<feed_type>', methods=['GET'])
+def verify_intent(feed_type):
+    """Answer the hub's verification of intent for (un)subscribe requests"""
+    if not push_enabled():
+        return 'WebSub disabled', 404
+
+    mode = request.args.get('hub.mode')
+    topic = request.args.get('hub.topic')
+    challenge = request.args.get('hub.challenge')
+
+    feed = Feed.query.filter_by(feed_type=feed_type).first()
+    if not feed or topic not in (feed.topic_url, feed.url):
+        return 'Unknown topic', 404
+
+    if mode not in ('subscribe', 'unsubscribe', 'denied'):
+        return 'Invalid mode', 400
+    if mode != 'denied' and not challenge:  # Denials carry no challenge
+        return 'Missing challenge', 400
+    if mode == 'subscribe' and (not feed.hub_url or feed.enabled is False):
+        return 'Not subscribing', 404
+
+    # Only verifications of a request we actually sent count; anything else could be forged
+    lease_seconds = request.args.get('hub.lease_seconds', type=int)
+    if not accept_verification(feed, mode, lease_seconds):
+        logger.warning(f"Ignoring unexpected WebSub {mode} verification for {feed_type}")
+        return 'No pending request', 404
+    db.session.commit()
+
+    if mode == 'denied':
+        logger.warning(f"WebSub subscription denied for {feed_type}: {request.args.get('hub.reason')}")
+        return '', 200
+
+    logger.info(f"WebSub {mode} verified for {feed_type}")
+    return challenge, 200, {'Content-Type': 'text/plain'}
+
+@websub_bp.route('/<feed_type>', methods=['POST'])
+def receive_push(feed_type):
+    """Receive content distributed by the hub and ingest it in the background"""
+    if not push_enabled():
+        return 'WebSub disabled', 404
+
+    body = request.get_data()
+    if not verify_signature(body, request.headers.get('X-Hub-Signature')):
+        # Per the spec the push is acknowledged but ignored
+        logger.warning(f"Ignoring WebSub push with invalid signature for {feed_type}")
+        return '', 202
+
+    feed = feedparser.parse(body)
+    if not feed.entries:
+        return '', 202
+
+    threading.Thread(target=_ingest, args=(feed_type, feed), daemon=True).start()
+    return '', 202
+
+def _ingest(feed_type, feed):
+    with app.app_context():
+        try:
+            scheduler = get_scheduler()
+            rss_monitor = scheduler.rss_monitor if scheduler else RSSMonitor()
+            rss_monitor.ingest_pushed_feed(feed_type, feed)
+        except Exception as e:
+            logger.error(f"Error ingesting WebSub push for {feed_type}: {str(e)}")
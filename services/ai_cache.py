@@ -0,0 +1,87 @@
+import hashlib
+import json
+import logging
+import re
+import threading
+import time
+import unicodedata
+from services.file_store import LruFileStore
+
+logger = logging.getLogger(__name__)
+
+
+def prompt_version(prompt_template):
+    """Short hash of the prompt template text; changes whenever the template is edited"""
+    return hashlib.sha256(prompt_template.encode('utf-8')).hexdigest()[:12]
+
+
+def normalize_text(text):
+    return re.sub(r'\s+', ' ', unicodedata.normalize('NFC', text or '')).strip()
+
+
+class AiResponseCache:
+    """Persistent, content-addressed cache of validated Gemini responses.
+
+    Entries are keyed by the prompt version, the model name and the normalized
+    title and content, and stored as small JSON files in a size-bounded
+    LruFileStore. Entries older than ttl_seconds count as misses and are removed.
+    """
+
+    def __init__(self, directory, ttl_seconds, max_size_bytes):
+        self.ttl_seconds = ttl_seconds
+        self.store = LruFileStore(directory, '.json', max_size_bytes, ttl_seconds, name='AI response cache')
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(prompt_template, model, title, content):
+        raw = '\x00'.join([prompt_version(prompt_template), model, normalize_text(title), normalize_text(content)])
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def get(self, key, count=True):
+        """Return the cached entry ({'result', 'ai_used', 'created_at'}) for key, or None.
+
+        count=False peeks without touching the hit-rate counters.
+        """
+        try:
+            data = self.store.read(key)
+            if data is None:
+                self._count(hit=False, enabled=count)
+                return None
+            entry = json.loads(data)
+            if time.time() - entry['created_at'] > self.ttl_seconds:
+                self.store.remove(key)
+                self._count(hit=False, enabled=count)
+                return None
+            self._count(hit=True, enabled=count)
+            return entry
+        except Exception as e:
+            logger.warning(f"Error reading AI response cache entry {key}: {str(e)}")
+            self._count(hit=False, enabled=count)
+            return None
+
+    def put(self, key, result, ai_used):
+        try:
+            self.store.write(key, json.dumps(
+                {'result': result, 'ai_used': ai_used, 'created_at': time.time()}, ensure_ascii=False
+            ).encode('utf-8'))
+        except Exception as e:
+            logger.warning(f"Error writing AI response cache entry {key}: {str(e)}")
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 3) if lookups else None
+        }
+
+    def _count(self, hit, enabled=True):
+        if not enabled:
+            return
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
@@ -1,18 +1,45 @@
+import asyncio
 import json
 import logging
+import random
+import threading
 import time
 import re
 from datetime import datetime
+import httpx
 from google import genai
-from google.genai import types
+from google.genai import types, errors
+from pydantic import ValidationError
 from app import db, app
 from models import Article, ProcessingLog
-from config import AI_CONFIG, UNIVERSAL_PROMPT
-from concurrent.futures import ThreadPoolExecutor
+from config import AI_CONFIG, AI_CACHE_CONFIG, UNIVERSAL_PROMPT, ARTICLE_PROMPT, PACKED_PROMPT
+from services.ai_cache import AiResponseCache
+from services.ai_schema import ArticleRewrite, PackedArticleRewrite, parse_article_rewrite, parse_article_rewrites
+from services.key_pool import ApiKey, KeyPool, QuotaExhausted
+from services.circuit_breaker import CircuitBreaker
+from services.latency import LatencyTracker
+from services.compaction import compact_text, estimate_tokens
+from services.instruction_cache import InstructionCache
+from services.model_router import ModelRouter
+from services.batch_backend import BATCH_BACKENDS, RUNNING, SUCCEEDED
 # import psutil  # Descomente para monitorar RAM
 
 logger = logging.getLogger(__name__)
 
+AI_TYPES = ('cinema', 'series')
+
+RETRYABLE_STATUS_CODES = (408, 429, 500, 502, 503, 504)
+BLOCKED_FINISH_REASONS = ('SAFETY', 'PROHIBITED_CONTENT', 'BLOCKLIST', 'SPII')
+
+
+class BlockedResponse(Exception):
+    """Gemini refused to answer (safety block); retrying or switching keys will not help"""
+
+
+class RetriesExhausted(Exception):
+    """Transient errors outlasted the article's retry budget"""
+
+
 class AIProcessor:
     _instance = None
     _initialized = False
@@ -25,11 +52,28 @@ class AIProcessor:
     def __init__(self):
         if not self._initialized:
             self.clients = {}
+            self._loop = None
+            self._loop_lock = threading.Lock()
             self._init_clients()
+            self._build_key_pool()
+            self._build_batch_backends()
+            self.latencies = LatencyTracker()
+            self.instruction_cache = InstructionCache(
+                AI_CONFIG['context_cache']['ttl_seconds']
+            ) if AI_CONFIG['context_cache']['enabled'] else None
+            self._build_router()
+            self.pack_stats = {'packs': 0, 'packed_articles': 0, 'fallbacks': 0}
+            self.hedge_stats = {'requests': 0, 'hedged': 0, 'hedge_wins': 0, 'latency_saved': 0.0}
+            self.response_cache = AiResponseCache(
+                AI_CACHE_CONFIG['directory'],
+                AI_CACHE_CONFIG['ttl_hours'] * 3600,
+                AI_CACHE_CONFIG['max_size_mb'] * 1024 * 1024
+            ) if AI_CACHE_CONFIG['enabled'] else None
             AIProcessor._initialized = True
 
     def _init_clients(self):
-        for ai_type, config in AI_CONFIG.items():
+        for ai_type in AI_TYPES:
+            config = AI_CONFIG[ai_type]
             if config['primary']:
                 try:
                     self.clients[f"{ai_type}_primary"] = genai.Client(api_key=config['primary'])
@@ -44,130 +88,649 @@ class AIProcessor:
                 except Exception as e:
                     logger.error(f"Failed to initialize {ai_type} backup AI: {str(e)}")
 
-    def process_pending_articles(self, max_articles=3):
+    def _build_key_pool(self):
+        """Wrap every initialized client in a rate-limited key for load balancing"""
+        limits = AI_CONFIG['rate_limits']
+        self.key_pool = KeyPool(
+            cross_pool_fallback=AI_CONFIG['cross_pool_fallback'],
+            max_wait=AI_CONFIG['max_quota_wait']
+        )
+        for client_key, client in self.clients.items():
+            key_limits = {**limits['default'], **limits.get(client_key, {})}
+            self.key_pool.add(ApiKey(
+                name=client_key,
+                pool=client_key.rsplit('_', 1)[0],
+                client=client,
+                requests_per_minute=key_limits['requests_per_minute'],
+                tokens_per_minute=key_limits['tokens_per_minute'],
+                weight=key_limits.get('weight', 1.0),
+                breaker=CircuitBreaker(**AI_CONFIG['circuit_breaker'])
+            ))
+
+    def _build_router(self):
+        routing = AI_CONFIG['model_routing']
+        self.router = ModelRouter(
+            routing['routes'] if routing['enabled'] else None,
+            AI_CONFIG['model'],
+            p95_latency_limit=routing['p95_latency_limit'],
+            max_failure_rate=routing['max_failure_rate'],
+            min_samples=routing['min_samples'],
+            demote_seconds=routing['demote_seconds']
+        )
+
+    def _build_batch_backends(self):
+        backend_class = BATCH_BACKENDS[AI_CONFIG['batch']['backend']]
+        self.batch_backends = {
+            client_key: backend_class(client, AI_CONFIG['model'])
+            for client_key, client in self.clients.items()
+        }
+
+    def submit_batches(self):
+        """Send the pending backlog as one batch job per AI type once it is large enough; returns articles submitted"""
+        batch_config = AI_CONFIG['batch']
         with app.app_context():
-            pending_articles = Article.query.filter_by(status='pending').limit(max_articles).all()
-            processed_count = 0
+            pending_articles = Article.query.filter_by(status='pending').order_by(
+                Article.created_at
+            ).limit(batch_config['max_articles']).all()
+            if len(pending_articles) < batch_config['min_articles']:
+                return 0
+
+            submitted_count = 0
+            for ai_type in AI_TYPES:
+                articles = [article for article in pending_articles if self._ai_type(article) == ai_type]
+                client_key = next(
+                    (key for key in (f"{ai_type}_primary", f"{ai_type}_backup")
+                     if key in self.batch_backends and self._key_usable(key)),
+                    None
+                )
+                if not articles or not client_key:
+                    continue
+
+                to_submit = []
+                for article in articles:
+                    _, cached = self._cached_response(article)
+                    if cached:
+                        article.ai_used = cached['ai_used']
+                        self._apply_result(article, cached['result'], 0)
+                    else:
+                        to_submit.append(article)
+                db.session.commit()
+                if not to_submit:
+                    continue
 
-            with ThreadPoolExecutor(max_workers=2) as executor:
-                future_to_article = {
-                    executor.submit(self._process_article, article): article
-                    for article in pending_articles
-                }
+                try:
+                    job_name = self.batch_backends[client_key].submit(
+                        [(article.id, self._build_prompt(article)) for article in to_submit],
+                        self._generation_config(),
+                        display_name=f"{ai_type}-{datetime.utcnow():%Y%m%d%H%M%S}"
+                    )
+                except Exception as e:
+                    logger.error(f"Error submitting {ai_type} batch with {client_key}: {str(e)}")
+                    continue
 
-                for future in future_to_article:
-                    article = future_to_article[future]
-                    try:
-                        result = future.result()
-                        if result:
-                            processed_count += 1
-                        else:
-                            article.status = 'failed'
-                            article.error_message = 'AI processing failed'
-                            self._log_processing(article.id, 'AI_PROCESSING', 'AI processing failed', article.ai_used, False)
-                        db.session.commit()
-                    except Exception as e:
-                        logger.error(f"Error processing article {article.id}: {str(e)}")
-                        article.status = 'failed'
-                        article.error_message = str(e)
-                        db.session.commit()
+                for article in to_submit:
+                    article.status = 'batching'
+                    article.batch_job = job_name
+                    article.ai_used = client_key
+                db.session.commit()
+                logger.info(f"Submitted batch {job_name} with {len(to_submit)} {ai_type} articles via {client_key}")
+                submitted_count += len(to_submit)
 
-        return processed_count
+        return submitted_count
 
-    def _process_article(self, article):
+    def poll_batches(self):
+        """Collect finished batch jobs and map their results back to articles; returns articles processed"""
+        processed_count = 0
         with app.app_context():
-            start_time = time.time()
-            article.status = 'processing'
-            db.session.commit()
+            jobs = db.session.query(Article.batch_job, Article.ai_used).filter(
+                Article.status == 'batching'
+            ).distinct().all()
 
-            ai_type = 'cinema' if article.feed_type == 'movies' else 'series'
-            result = self._process_with_ai(article, ai_type)
+            for job_name, client_key in jobs:
+                backend = self.batch_backends.get(client_key)
+                articles = Article.query.filter_by(status='batching', batch_job=job_name).all()
+                try:
+                    if backend is None:
+                        raise Exception(f"no batch backend for {client_key}")
+                    state, results = backend.poll(job_name)
+                except Exception as e:
+                    logger.error(f"Error polling batch {job_name}: {str(e)}")
+                    continue
+
+                if state == RUNNING:
+                    continue
+
+                if state != SUCCEEDED:
+                    # Job failed, expired or was cancelled: hand the articles back to the normal queue
+                    for article in articles:
+                        article.status = 'pending'
+                        article.batch_job = None
+                    db.session.commit()
+                    logger.warning(f"Batch {job_name} did not succeed, {len(articles)} articles requeued")
+                    continue
+
+                outcomes = []
+                for article in articles:
+                    text = results.get(str(article.id))
+                    try:
+                        if not text:
+                            raise ValueError('no response in batch output')
+                        result = parse_article_rewrite(text)
+                        self._apply_result(article, result, None)
+                        cache_key, _ = self._cached_response(article, lookup=False)
+                        if cache_key:
+                            self.response_cache.put(cache_key, result, client_key)
+                        outcomes.append((article.id, True, 'Successfully processed article in batch'))
+                        processed_count += 1
+                    except (ValueError, ValidationError) as e:
+                        article.status = 'failed'
+                        article.error_message = f"Batch result invalid: {str(e)[:200]}"
+                        outcomes.append((article.id, False, 'Batch AI processing failed'))
+                    article.batch_job = None
+                db.session.commit()
 
-            if result:
-                article.titulo_final = re.sub(r'</?strong>', '', result.get('titulo_final', ''))
-                article.conteudo_final = self._correct_paragraphs(result.get('conteudo_final'))
-                article.meta_description = result.get('meta_description')
-                article.focus_keyword = result.get('focus_keyword')
-                article.categoria = result.get('categoria')
-                article.obra_principal = result.get('obra_principal')
-                article.tags = json.dumps(result.get('tags', []))
-                article.status = 'processed'
-                article.processed_at = datetime.utcnow()
-                article.processing_time = int(time.time() - start_time)
-
-                self._log_processing(article.id, 'AI_PROCESSING', 'Successfully processed article', article.ai_used, True)
-                logger.info(f"Successfully processed article: {article.original_title}")
-
-                # Descomente para monitorar RAM
-                # mem = psutil.virtual_memory()
-                # logger.info(f"RAM usage: {mem.percent}%")
-
-                # Pausa para aliviar uso de memória
-                time.sleep(1.5)
+                for article_id, success, message in outcomes:
+                    self._log_processing(article_id, 'AI_BATCH', message, client_key, success)
+                logger.info(f"Batch {job_name} finished: {sum(1 for o in outcomes if o[1])}/{len(outcomes)} articles processed")
 
-            else:
-                article.status = 'failed'
-                article.error_message = 'AI processing failed'
-                self._log_processing(article.id, 'AI_PROCESSING', 'AI processing failed', article.ai_used, False)
+        return processed_count
+
+    def _run_async(self, coro):
+        """Run a coroutine on the processor's long-lived event loop and wait for it.
+
+        The genai clients keep one httpx.AsyncClient (and its pooled connections)
+        across runs, bound to the loop that first used it, so all runs share a loop
+        living in its own thread instead of a fresh asyncio.run() each cycle.
+        """
+        with self._loop_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, name='ai-event-loop', daemon=True).start()
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    def shutdown(self):
+        """Stop the event loop thread"""
+        with self._loop_lock:
+            if self._loop is not None:
+                self._loop.call_soon_threadsafe(self._loop.stop)
+                self._loop = None
+
+    def requeue_interrupted_articles(self):
+        """Return articles left in 'processing' by an interrupted run (e.g. a restart) to the queue"""
+        try:
+            with app.app_context():
+                count = Article.query.filter_by(status='processing').update({'status': 'pending'})
+                db.session.commit()
+            if count:
+                logger.warning(f"Requeued {count} articles interrupted while processing")
+            return count
+        except Exception as e:
+            logger.error(f"Error requeuing interrupted articles: {str(e)}")
+            return 0
+
+    def process_pending_articles(self, max_articles=3):
+        with app.app_context():
+            pending_articles = Article.query.filter_by(status='pending').limit(max_articles).all()
+            if not pending_articles:
+                return 0
 
+            for article in pending_articles:
+                article.status = 'processing'
             db.session.commit()
 
-    def _process_with_ai(self, article, ai_type):
-        client_key = f"{ai_type}_primary"
-        if client_key in self.clients:
-            result = self._call_ai(self.clients[client_key], article, client_key)
-            if result:
-                article.ai_used = client_key
-                return result
+            try:
+                outcomes = self._run_async(self._process_articles_async(pending_articles))
+            except Exception as e:
+                logger.error(f"AI processing run failed, requeuing {len(pending_articles)} articles: {str(e)}")
+                db.session.rollback()
+                for article in pending_articles:
+                    article.status = 'pending'
+                db.session.commit()
+                return 0
 
-        client_key = f"{ai_type}_backup"
-        if client_key in self.clients:
-            logger.warning(f"Primary {ai_type} AI failed, trying backup")
-            result = self._call_ai(self.clients[client_key], article, client_key)
-            if result:
-                article.ai_used = client_key
-                return result
+            processed_count = 0
+            for article, outcome in zip(pending_articles, outcomes):
+                try:
+                    if isinstance(outcome, (QuotaExhausted, RetriesExhausted)):
+                        # Not the article's fault: leave it for the next cycle
+                        logger.warning(f"Article {article.id} postponed: {str(outcome)}")
+                        article.status = 'pending'
+                        db.session.commit()
+                        continue
+                    if isinstance(outcome, Exception):
+                        raise outcome
 
-        logger.error(f"Both primary and backup {ai_type} AIs failed")
-        return None
+                    result, elapsed = outcome
+                    if result:
+                        self._apply_result(article, result, elapsed)
+                        db.session.commit()
+                        self._log_processing(article.id, 'AI_PROCESSING', 'Successfully processed article', article.ai_used, True)
+                        logger.info(f"Successfully processed article: {article.original_title}")
+                        processed_count += 1
+                    else:
+                        article.status = 'failed'
+                        article.error_message = 'AI processing failed'
+                        db.session.commit()
+                        self._log_processing(article.id, 'AI_PROCESSING', 'AI processing failed', article.ai_used, False)
+                except Exception as e:
+                    logger.error(f"Error processing article {article.id}: {str(e)}")
+                    article.status = 'failed'
+                    article.error_message = str(e)
+                    db.session.commit()
 
-    def _call_ai(self, client, article, ai_name):
-        try:
-            prompt = UNIVERSAL_PROMPT.format(
-                titulo=article.original_title,
-                conteudo=article.original_content
+        return processed_count
+
+    async def _process_articles_async(self, articles):
+        """Process articles concurrently, bounded by a semaphore per API key"""
+        # Created per run: asyncio primitives are bound to the loop that uses them
+        semaphores = {
+            client_key: asyncio.Semaphore(AI_CONFIG['max_concurrency_per_key'])
+            for client_key in self.clients
+        }
+        if self.instruction_cache:
+            await self.instruction_cache.refresh(self.clients, UNIVERSAL_PROMPT, self.router.models())
+
+        packs, singles = self._plan_packs(articles) if AI_CONFIG['packing']['enabled'] else ([], articles)
+        outcomes = await asyncio.gather(
+            *(self._process_pack(pack, ai_type, model, semaphores) for ai_type, model, pack in packs),
+            *(self._process_article(article, semaphores) for article in singles),
+            return_exceptions=True
+        )
+
+        # Map back to the original order; an exception from a whole pack applies to each of its articles
+        by_article = {}
+        for (_, _, pack), outcome in zip(packs, outcomes):
+            pack_outcomes = outcome if isinstance(outcome, list) else [outcome] * len(pack)
+            for article, article_outcome in zip(pack, pack_outcomes):
+                by_article[article.id] = article_outcome
+        for article, outcome in zip(singles, outcomes[len(packs):]):
+            by_article[article.id] = outcome
+        return [by_article[article.id] for article in articles]
+
+    async def _process_article(self, article, semaphores):
+        start_time = time.time()
+        ai_type = self._ai_type(article)
+        result = await self._process_with_ai(article, ai_type, semaphores)
+        return result, int(time.time() - start_time)
+
+    def _ai_type(self, article):
+        return 'cinema' if article.feed_type == 'movies' else 'series'
+
+    def _build_prompt(self, article):
+        return ARTICLE_PROMPT.format(
+            titulo=article.original_title,
+            conteudo=self._compact_content(article)
+        )
+
+    def _compact_content(self, article, log=True):
+        compaction = AI_CONFIG['compaction']
+        if not compaction['enabled']:
+            return article.original_content
+        content = compact_text(article.original_content, compaction['max_input_tokens'])
+        before, after = estimate_tokens(article.original_content), estimate_tokens(content)
+        if log and before > after:
+            logger.info(f"Compacted article {article.id}: {before} -> {after} tokens ({before - after} saved)")
+        return content
+
+    def _generation_config(self, cached_content=None, packed=False):
+        """The static instructions travel as cached content when available, otherwise as system_instruction"""
+        if cached_content:
+            instructions = {'cached_content': cached_content}
+        else:
+            instructions = {'system_instruction': UNIVERSAL_PROMPT}
+        return types.GenerateContentConfig(
+            response_mime_type="application/json",
+            response_schema=list[PackedArticleRewrite] if packed else ArticleRewrite,  # typing.List is rejected by the SDK
+            **instructions
+        )
+
+    def _cached_response(self, article, lookup=True, model=None):
+        """Return (cache key, cached entry or None); the key is None when the cache is disabled"""
+        if not self.response_cache:
+            return None, None
+        # Compaction settings change the text the model sees, so they are part of the prompt version
+        cache_key = AiResponseCache.make_key(
+            UNIVERSAL_PROMPT + ARTICLE_PROMPT + json.dumps(AI_CONFIG['compaction'], sort_keys=True),
+            model or AI_CONFIG['model'],
+            article.original_title, article.original_content
+        )
+        return cache_key, self.response_cache.get(cache_key) if lookup else None
+
+    def _apply_result(self, article, result, elapsed):
+        article.titulo_final = re.sub(r'</?strong>', '', result.get('titulo_final', ''))
+        article.conteudo_final = self._correct_paragraphs(result.get('conteudo_final'))
+        article.meta_description = result.get('meta_description')
+        article.focus_keyword = result.get('focus_keyword')
+        article.categoria = result.get('categoria')
+        article.obra_principal = result.get('obra_principal')
+        article.tags = json.dumps(result.get('tags', []))
+        article.status = 'processed'
+        article.processed_at = datetime.utcnow()
+        article.processing_time = elapsed
+
+        # Descomente para monitorar RAM
+        # mem = psutil.virtual_memory()
+        # logger.info(f"RAM usage: {mem.percent}%")
+
+    async def _process_with_ai(self, article, ai_type, semaphores):
+        """Rewrite one article, serving it from the response cache when possible"""
+        prompt = self._build_prompt(article)
+        _, model = self._route(article)
+        cache_key, cached = self._cached_response(article, model=model)
+        if cached:
+            logger.info(f"AI response cache hit for article {article.id}")
+            article.ai_used = cached['ai_used']
+            return cached['result']
+
+        key_name, result = await self._generate(ai_type, prompt, semaphores, f"Article {article.id}", model=model)
+        if result:
+            article.ai_used = key_name
+            if cache_key:
+                self.response_cache.put(cache_key, result, key_name)
+        return result
+
+    async def _process_pack(self, articles, ai_type, model, semaphores):
+        """Rewrite several short articles with one request; returns one outcome per article.
+
+        If the packed answer fails validation, including rewrites whose article
+        numbers do not match the pack, the articles fall back to one call each.
+        """
+        start_time = time.time()
+        prompt = PACKED_PROMPT.format(
+            quantidade=len(articles),
+            artigos=''.join(
+                f"\n--- ARTIGO {number} ---{self._build_prompt(article)}"
+                for number, article in enumerate(articles, 1)
+            )
+        )
+        key_name, results = await self._generate(
+            ai_type, prompt, semaphores, f"Pack of {len(articles)} articles",
+            packed_count=len(articles), fallback_keys=False, model=model
+        )
+        if not results:
+            logger.warning(f"Packed request for {len(articles)} articles failed, falling back to single calls")
+            self.pack_stats['fallbacks'] += 1
+            return await asyncio.gather(
+                *(self._process_article(article, semaphores) for article in articles),
+                return_exceptions=True
             )
 
-            response = client.models.generate_content(
-                model="gemini-2.5-flash",
-                contents=prompt,
-                config=types.GenerateContentConfig(
-                    response_mime_type="application/json"
-                )
+        self.pack_stats['packs'] += 1
+        self.pack_stats['packed_articles'] += len(articles)
+        elapsed = int(time.time() - start_time)
+        for article, result in zip(articles, results):
+            article.ai_used = key_name
+            cache_key, _ = self._cached_response(article, lookup=False, model=model)
+            if cache_key:
+                self.response_cache.put(cache_key, result, key_name)
+        return [(result, elapsed) for result in results]
+
+    def _route(self, article):
+        """(route name, model) for an article, by feed and compacted content size"""
+        tokens = self._estimate_tokens(self._compact_content(article, log=False))
+        return self.router.choose(article.feed_type, tokens)
+
+    def _plan_packs(self, articles):
+        """Split articles into packs of short ones and the rest.
+
+        Packs share an AI type and a routed model and stay under the token budget;
+        returns ([(ai_type, model, articles)], single articles).
+        """
+        packing = AI_CONFIG['packing']
+        packs, singles, open_packs = [], [], {}
+        for article in articles:
+            _, model = self._route(article)
+            cache_key, _ = self._cached_response(article, lookup=False, model=model)
+            tokens = self._estimate_tokens(self._compact_content(article, log=False))
+            if tokens > packing['short_article_tokens'] or (cache_key and self.response_cache.get(cache_key, count=False)):
+                singles.append(article)
+                continue
+
+            group = (self._ai_type(article), model)
+            pack, pack_tokens = open_packs.get(group, ([], 0))
+            if pack and (pack_tokens + tokens > packing['pack_token_budget']
+                         or len(pack) >= packing['max_articles_per_pack']):
+                packs.append((*group, pack))
+                pack, pack_tokens = [], 0
+            pack.append(article)
+            open_packs[group] = (pack, pack_tokens + tokens)
+
+        for group, (pack, _) in open_packs.items():
+            if len(pack) > 1:
+                packs.append((*group, pack))
+            else:
+                singles.extend(pack)
+        return packs, singles
+
+    async def _generate(self, ai_type, prompt, semaphores, label, packed_count=None, fallback_keys=True, model=None):
+        """Try keys picked by the key pool (own pool first, then fallback pools) until one succeeds.
+
+        Transient errors (429, 5xx, timeouts) are retried with jittered exponential
+        backoff within the time budget; other failures move on to the next key
+        (unless fallback_keys is False). Returns (key name, result) or (None, None).
+        """
+        estimated_tokens = (self._estimate_tokens(UNIVERSAL_PROMPT) + self._estimate_tokens(prompt)
+                            + AI_CONFIG['expected_output_tokens'] * (packed_count or 1))
+        retry_config = AI_CONFIG['retry']
+        deadline = time.monotonic() + retry_config['article_time_budget']
+        tried = set()
+        retries = 0
+
+        while True:
+            key = await self.key_pool.acquire(ai_type, estimated_tokens, exclude=tried)
+            if key is None:
+                break
+
+            key, result, error, used_keys = await self._attempt_with_hedge(
+                key, ai_type, prompt, estimated_tokens, semaphores, deadline, tried, packed_count, model
             )
 
-            if response.text:
+            if result:
+                return key.name, result
+
+            if isinstance(error, BlockedResponse):
+                logger.error(f"{label} blocked by {key.name}: {str(error)}")
+                return None, None
+
+            if error is not None and self._is_retryable(error):
+                delay = self._backoff_delay(retries, self._retry_after(error))
+                retries += 1
+                if retries > retry_config['max_retries'] or time.monotonic() + delay > deadline:
+                    raise RetriesExhausted(f"{retries} attempts, last error: {str(error)}")
+                logger.warning(f"{key.name} transient error, retrying in {delay:.1f}s")
+                # Not added to tried: after the pause the pool may hand out this key again
+                await asyncio.sleep(delay)
+                continue
+
+            if not fallback_keys:
+                return None, None
+            tried.update(used_key.name for used_key in used_keys)
+            logger.warning(f"{key.name} AI failed, trying next key")
+
+        logger.error(f"All {ai_type} AI keys failed")
+        return None, None
+
+    async def _attempt(self, key, prompt, estimated_tokens, semaphores, deadline, packed_count=None, model=None):
+        """One call on an acquired key; returns (result, error) and always releases the key"""
+        result, used_tokens, error = None, None, None
+        try:
+            async with semaphores[key.name]:
+                start_time = time.monotonic()
                 try:
-                    result = json.loads(response.text)
-                    required_fields = ['titulo_final', 'conteudo_final', 'meta_description',
-                                       'focus_keyword', 'categoria', 'obra_principal', 'tags']
+                    timeout = max(1, min(AI_CONFIG['retry']['request_timeout'], deadline - time.monotonic()))
+                    result, used_tokens = await asyncio.wait_for(
+                        self._call_ai(key.client, prompt, key.name, self._cached_instructions(key.name, model),
+                                      packed_count, model),
+                        timeout
+                    )
+                    latency = time.monotonic() - start_time
+                    key.breaker.record(True, latency)
+                    self.latencies.record(latency)
+                    self.router.record(model or AI_CONFIG['model'], latency, result is not None)
+                except BlockedResponse as e:
+                    # The key worked; the content is what got refused
+                    key.breaker.record(True, time.monotonic() - start_time)
+                    error = e
+                except asyncio.CancelledError:
+                    # Lost a hedge race: keep the elapsed time as a lower bound so slow calls stay in the percentile
+                    self.latencies.record(time.monotonic() - start_time)
+                    raise
+                except Exception as e:
+                    logger.error(f"AI call failed for {key.name}: {str(e)}")
+                    key.breaker.record(False, time.monotonic() - start_time, fatal=self._is_key_error(e))
+                    self.router.record(model or AI_CONFIG['model'], time.monotonic() - start_time, False)
+                    error = e
+        except asyncio.CancelledError:
+            # A cancelled call says nothing about the key: let the next call be the half-open probe
+            key.breaker.release_probe()
+            raise
+        finally:
+            self.key_pool.release(key, estimated_tokens, used_tokens)
+        return result, error
+
+    def _hedge_delay(self):
+        """Adaptive hedge deadline (a percentile of recent latencies), or None while hedging is off"""
+        hedging = AI_CONFIG['hedging']
+        if not hedging['enabled'] or len(self.latencies) < hedging['min_samples']:
+            return None
+        return max(hedging['min_delay'], self.latencies.percentile(hedging['percentile']))
+
+    async def _attempt_with_hedge(self, key, ai_type, prompt, estimated_tokens, semaphores, deadline, tried,
+                                  packed_count=None, model=None):
+        """Call on key; if it has not answered by the hedge deadline, race the same request on a second key.
+
+        Returns (key that answered last, result, error, keys used). The slower call is cancelled.
+        """
+        self.hedge_stats['requests'] += 1
+        primary = asyncio.create_task(
+            self._attempt(key, prompt, estimated_tokens, semaphores, deadline, packed_count, model)
+        )
+        hedge_delay = self._hedge_delay()
+        backup = None
+        if hedge_delay is not None:
+            done, _ = await asyncio.wait({primary}, timeout=hedge_delay)
+            if not done:
+                backup = self.key_pool.try_acquire(ai_type, estimated_tokens, exclude=tried | {key.name})
+
+        if backup is None:
+            result, error = await primary
+            return key, result, error, [key]
+
+        logger.info(f"{key.name} slower than {hedge_delay:.1f}s, hedging on {backup.name}")
+        self.hedge_stats['hedged'] += 1
+        hedge_start = time.monotonic()
+        hedge = asyncio.create_task(
+            self._attempt(backup, prompt, estimated_tokens, semaphores, deadline, packed_count, model)
+        )
+
+        running = {primary: key, hedge: backup}
+        winner, result, error = key, None, None
+        while running and not result:
+            done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                winner = running.pop(task)
+                result, error = task.result()
+                if result:
+                    break
+
+        for task in running:
+            task.cancel()
+        await asyncio.gather(*running, return_exceptions=True)
+
+        if result and winner is backup:
+            self.hedge_stats['hedge_wins'] += 1
+            # Estimate what the primary would have taken from earlier calls that were this slow
+            expected = self.latencies.mean_above(hedge_delay)
+            elapsed = hedge_delay + (time.monotonic() - hedge_start)
+            if expected:
+                self.hedge_stats['latency_saved'] += max(0.0, expected - elapsed)
+        return winner, result, error, [key, backup]
+
+    def _estimate_tokens(self, text):
+        return estimate_tokens(text)
+
+    def _is_retryable(self, error):
+        if isinstance(error, errors.APIError):
+            return error.code in RETRYABLE_STATUS_CODES
+        return isinstance(error, (asyncio.TimeoutError, httpx.TransportError))
+
+    def _retry_after(self, error):
+        """Seconds the server asked us to wait (Retry-After header or RetryInfo detail), if any"""
+        try:
+            headers = getattr(getattr(error, 'response', None), 'headers', None)
+            if headers and headers.get('retry-after'):
+                return float(headers.get('retry-after'))
+
+            details = getattr(error, 'details', None)
+            if isinstance(details, dict):
+                for detail in details.get('error', {}).get('details', []):
+                    retry_delay = detail.get('retryDelay') if isinstance(detail, dict) else None
+                    if isinstance(retry_delay, str) and retry_delay.endswith('s'):
+                        return float(retry_delay[:-1])
+        except (TypeError, ValueError):
+            pass
+        return None
 
-                    if all(field in result for field in required_fields):
-                        return result
-                    else:
-                        logger.error(f"Missing required fields in AI response from {ai_name}")
-                        return None
+    def _backoff_delay(self, retries, retry_after=None):
+        """Full-jitter exponential backoff, never shorter than the server's retry-after hint"""
+        retry_config = AI_CONFIG['retry']
+        cap = min(retry_config['max_delay'], retry_config['base_delay'] * 2 ** retries)
+        delay = random.uniform(retry_config['base_delay'], max(retry_config['base_delay'], cap))
+        return max(delay, retry_after or 0)
 
-                except json.JSONDecodeError as e:
-                    logger.error(f"Invalid JSON response from {ai_name}: {str(e)}")
-                    return None
-            else:
-                logger.error(f"Empty response from {ai_name}")
-                return None
+    def _is_key_error(self, error):
+        """Errors that mean the key itself is unusable (revoked, invalid, no permission)"""
+        return isinstance(error, errors.APIError) and error.code in (401, 403)
 
-        except Exception as e:
-            logger.error(f"AI call failed for {ai_name}: {str(e)}")
+    def _cached_instructions(self, client_key, model=None):
+        if not self.instruction_cache:
             return None
+        return self.instruction_cache.get(client_key, model or AI_CONFIG['model'])
+
+    async def _call_ai(self, client, prompt, ai_name, cached_content=None, packed_count=None, model=None):
+        """Call Gemini once; returns (result or None, total tokens used or None).
+
+        With packed_count the prompt holds that many articles and the result is a
+        list with one rewrite per article, in article order (matched by the
+        artigo number each rewrite carries).
+
+        API/transport errors are raised so the caller can retry them and feed the
+        key's circuit breaker, safety blocks raise BlockedResponse, and an unusable
+        response body just yields a None result.
+        """
+        response = await client.aio.models.generate_content(
+            model=model or AI_CONFIG['model'],
+            contents=prompt,
+            config=self._generation_config(cached_content, packed=packed_count is not None)
+        )
+        usage = getattr(response, 'usage_metadata', None)
+        used_tokens = getattr(usage, 'total_token_count', None) if usage else None
+
+        block_reason = self._block_reason(response)
+        if block_reason:
+            raise BlockedResponse(f"{ai_name} blocked the response: {block_reason}")
+
+        if response.text:
+            try:
+                if packed_count:
+                    return parse_article_rewrites(response.text, packed_count), used_tokens
+                return parse_article_rewrite(response.text), used_tokens
+            except ValidationError as e:
+                logger.error(f"Invalid AI response from {ai_name}: {e.error_count()} schema errors, first: {e.errors()[0]['msg']}")
+                return None, used_tokens
+        else:
+            logger.error(f"Empty response from {ai_name}")
+            return None, used_tokens
+
+    def _block_reason(self, response):
+        feedback = getattr(response, 'prompt_feedback', None)
+        if feedback is not None and getattr(feedback, 'block_reason', None):
+            return str(feedback.block_reason)
+        for candidate in getattr(response, 'candidates', None) or []:
+            finish_reason = getattr(candidate, 'finish_reason', None)
+            if finish_reason is not None and getattr(finish_reason, 'name', str(finish_reason)) in BLOCKED_FINISH_REASONS:
+                return str(finish_reason)
+        return None
 
     def _correct_paragraphs(self, content):
         if not content:
@@ -208,14 +771,32 @@ class AIProcessor:
 
     def get_ai_status(self):
         status = {}
-        for ai_type in ['cinema', 'series']:
+        for ai_type in AI_TYPES:
             status[ai_type] = {
-                'primary_available': f"{ai_type}_primary" in self.clients,
-                'backup_available': f"{ai_type}_backup" in self.clients,
+                'primary_available': self._key_usable(f"{ai_type}_primary"),
+                'backup_available': self._key_usable(f"{ai_type}_backup"),
                 'last_used': self._get_last_used_time(ai_type)
             }
+        status['keys'] = self.key_pool.status()
+        if self.response_cache:
+            status['response_cache'] = self.response_cache.stats()
+        status['routes'] = self.router.status()
+        status['packing'] = {'enabled': AI_CONFIG['packing']['enabled'], **self.pack_stats}
+        requests = self.hedge_stats['requests']
+        status['hedging'] = {
+            'enabled': AI_CONFIG['hedging']['enabled'],
+            'current_delay': self._hedge_delay(),
+            'hedged': self.hedge_stats['hedged'],
+            'hedge_rate': round(self.hedge_stats['hedged'] / requests, 3) if requests else None,
+            'hedge_wins': self.hedge_stats['hedge_wins'],
+            'latency_saved_seconds': round(self.hedge_stats['latency_saved'], 1)
+        }
         return status
 
+    def _key_usable(self, client_key):
+        key = self.key_pool.keys.get(client_key)
+        return key is not None and key.breaker.state != CircuitBreaker.OPEN
+
     def _get_last_used_time(self, ai_type):
         last_log = ProcessingLog.query.filter(
             ProcessingLog.ai_used.like(f"{ai_type}%")
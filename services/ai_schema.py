@@ -0,0 +1,49 @@
+from typing import List, Literal
+
+from pydantic import BaseModel, TypeAdapter, ValidationError
+from pydantic_core import PydanticCustomError
+
+
+class ArticleRewrite(BaseModel):
+    """The fields Gemini must return for every rewritten article (see UNIVERSAL_PROMPT)"""
+    titulo_final: str
+    conteudo_final: str
+    meta_description: str
+    focus_keyword: str
+    categoria: Literal['Filmes', 'Séries', 'Notícias']
+    obra_principal: str
+    tags: List[str]
+
+
+def parse_article_rewrite(text):
+    """Validate a JSON response against ArticleRewrite; returns a plain dict or raises ValidationError"""
+    return ArticleRewrite.model_validate_json(text).model_dump()
+
+
+class PackedArticleRewrite(ArticleRewrite):
+    """One rewrite inside a packed response, tagged with the number of the article it answers"""
+    artigo: int
+
+
+_PACKED_REWRITES = TypeAdapter(List[PackedArticleRewrite])
+
+
+def parse_article_rewrites(text, count):
+    """Validate a packed response: one PackedArticleRewrite for each article number 1..count.
+
+    Rewrites are returned in article order without the artigo field; a missing,
+    repeated or unknown article number raises ValidationError.
+    """
+    rewrites = _PACKED_REWRITES.validate_json(text)
+    numbers = sorted(rewrite.artigo for rewrite in rewrites)
+    if numbers != list(range(1, count + 1)):
+        raise ValidationError.from_exception_data('PackedArticleRewrite list', [{
+            'type': PydanticCustomError(
+                'article_numbers', 'expected one rewrite for each article 1..{count}, got {numbers}',
+                {'count': count, 'numbers': numbers}
+            ),
+            'loc': ('artigo',),
+            'input': numbers
+        }])
+    rewrites.sort(key=lambda rewrite: rewrite.artigo)
+    return [rewrite.model_dump(exclude={'artigo'}) for rewrite in rewrites]
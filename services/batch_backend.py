@@ -0,0 +1,125 @@
+import itertools
+import logging
+from abc import ABC, abstractmethod
+from google.genai import types
+
+logger = logging.getLogger(__name__)
+
+# Normalized batch job states
+RUNNING = 'running'
+SUCCEEDED = 'succeeded'
+FAILED = 'failed'
+
+_GEMINI_STATES = {
+    'JOB_STATE_SUCCEEDED': SUCCEEDED,
+    'JOB_STATE_PARTIALLY_SUCCEEDED': SUCCEEDED,
+    'JOB_STATE_FAILED': FAILED,
+    'JOB_STATE_CANCELLED': FAILED,
+    'JOB_STATE_EXPIRED': FAILED,
+}
+
+
+class BatchBackend(ABC):
+    """Interface for submitting many prompts as one asynchronous batch job.
+
+    submit() takes a list of (request_key, prompt) pairs and returns a job name;
+    poll() returns (state, results) where results maps request_key to the
+    response text (or None for a failed item) once the job has succeeded.
+    """
+
+    @abstractmethod
+    def submit(self, requests, generation_config, display_name=None):
+        ...
+
+    @abstractmethod
+    def poll(self, job_name):
+        ...
+
+    @abstractmethod
+    def cancel(self, job_name):
+        ...
+
+
+class GeminiBatchBackend(BatchBackend):
+    """Gemini Batch API with inlined requests"""
+
+    def __init__(self, client, model):
+        self.client = client
+        self.model = model
+
+    def submit(self, requests, generation_config, display_name=None):
+        job = self.client.batches.create(
+            model=self.model,
+            src=[
+                types.InlinedRequest(contents=prompt, metadata={'key': str(request_key)}, config=generation_config)
+                for request_key, prompt in requests
+            ],
+            config=types.CreateBatchJobConfig(display_name=display_name)
+        )
+        return job.name
+
+    def poll(self, job_name):
+        job = self.client.batches.get(name=job_name)
+        state_name = getattr(job.state, 'name', str(job.state))
+        state = _GEMINI_STATES.get(state_name, RUNNING)
+        if state != SUCCEEDED:
+            if state == FAILED:
+                logger.error(f"Batch job {job_name} ended as {state_name}: {job.error}")
+            return state, None
+
+        results = {}
+        for inlined in (job.dest.inlined_responses if job.dest else None) or []:
+            request_key = (inlined.metadata or {}).get('key')
+            if request_key is None:
+                continue
+            if inlined.error or not inlined.response:
+                results[request_key] = None
+            else:
+                results[request_key] = inlined.response.text
+        return state, results
+
+    def cancel(self, job_name):
+        self.client.batches.cancel(name=job_name)
+
+
+class FakeBatchBackend(BatchBackend):
+    """In-process batch service for tests (AI_CONFIG['batch']['backend'] = 'fake').
+
+    Built like any backend from (client, model). Jobs end as final_state after
+    polls_to_finish polls and answer every prompt with respond(prompt); tests
+    set these attributes to script failures and invalid items.
+    """
+
+    _ids = itertools.count(1)
+
+    def __init__(self, client, model, respond=None, polls_to_finish=1, final_state=SUCCEEDED):
+        self.client = client
+        self.model = model
+        self.respond = respond or (lambda prompt: None)
+        self.polls_to_finish = polls_to_finish
+        self.final_state = final_state
+        self.jobs = {}
+
+    def submit(self, requests, generation_config, display_name=None):
+        job_name = f"batches/fake-{next(self._ids)}"
+        self.jobs[job_name] = {'requests': list(requests), 'polls': 0, 'state': RUNNING}
+        return job_name
+
+    def poll(self, job_name):
+        job = self.jobs[job_name]
+        if job['state'] == RUNNING:
+            job['polls'] += 1
+            if job['polls'] >= self.polls_to_finish:
+                job['state'] = self.final_state
+        if job['state'] != SUCCEEDED:
+            return job['state'], None
+        return SUCCEEDED, {str(request_key): self.respond(prompt) for request_key, prompt in job['requests']}
+
+    def cancel(self, job_name):
+        self.jobs[job_name]['state'] = FAILED
+
+
+BATCH_BACKENDS = {
+    'gemini': GeminiBatchBackend,
+    'fake': FakeBatchBackend,
+}
@@ -0,0 +1,124 @@
+import threading
+import time
+from collections import deque
+
+
+class CircuitBreaker:
+    """Per-key circuit breaker driven by error rate and latency over a sliding window.
+
+    closed: calls flow normally. The breaker opens when, with at least
+    min_calls outcomes in the window, the error rate or the share of slow
+    calls crosses its threshold (or on a fatal error such as a revoked key).
+    open: calls are refused until open_seconds have passed.
+    half_open: a single probe call is let through; success closes the
+    breaker, failure opens it again.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, window=20, min_calls=5, error_threshold=0.5, slow_call_seconds=60,
+                 slow_call_threshold=0.8, open_seconds=60):
+        self.window = deque(maxlen=window)
+        self.min_calls = min_calls
+        self.error_threshold = error_threshold
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_call_threshold = slow_call_threshold
+        self.open_seconds = open_seconds
+        self.state = self.CLOSED
+        self.opened_at = None
+        self.probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def _maybe_half_open(self):
+        if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.open_seconds:
+            self.state = self.HALF_OPEN
+            self.probe_in_flight = False
+
+    def is_available(self):
+        """Whether a call may be sent now (does not reserve the half-open probe)"""
+        with self._lock:
+            self._maybe_half_open()
+            if self.state == self.OPEN:
+                return False
+            if self.state == self.HALF_OPEN:
+                return not self.probe_in_flight
+            return True
+
+    def on_acquire(self):
+        with self._lock:
+            if self.state == self.HALF_OPEN:
+                self.probe_in_flight = True
+
+    def release_probe(self):
+        """Give back the half-open probe of a call that ended without an outcome (e.g. cancelled)"""
+        with self._lock:
+            if self.state == self.HALF_OPEN:
+                self.probe_in_flight = False
+
+    def retry_in(self):
+        """Seconds until an open breaker lets a probe through"""
+        with self._lock:
+            if self.state != self.OPEN:
+                return 0.0
+            return max(0.0, self.open_seconds - (time.monotonic() - self.opened_at))
+
+    def record(self, success, latency, fatal=False):
+        with self._lock:
+            self.window.append((success, latency))
+
+            if fatal:
+                self._open()
+                return
+
+            if self.state == self.HALF_OPEN:
+                if success and latency < self.slow_call_seconds:
+                    self.state = self.CLOSED
+                    self.window.clear()
+                else:
+                    self._open()
+                return
+
+            if self.state == self.CLOSED and len(self.window) >= self.min_calls:
+                if self._error_rate() >= self.error_threshold or self._slow_rate() >= self.slow_call_threshold:
+                    self._open()
+
+    def _open(self):
+        self.state = self.OPEN
+        self.opened_at = time.monotonic()
+        self.probe_in_flight = False
+
+    def _error_rate(self):
+        return sum(1 for success, _ in self.window if not success) / len(self.window) if self.window else 0.0
+
+    def _slow_rate(self):
+        return sum(1 for _, latency in self.window if latency >= self.slow_call_seconds) / len(self.window) \
+            if self.window else 0.0
+
+    def _mean_latency(self):
+        latencies = [latency for success, latency in self.window if success]
+        return sum(latencies) / len(latencies) if latencies else None
+
+    def health_score(self):
+        """0.0 (unusable) to 1.0 (healthy): success rate weighted down by slowness"""
+        with self._lock:
+            self._maybe_half_open()
+            if self.state == self.OPEN:
+                return 0.0
+            mean_latency = self._mean_latency()
+            latency_factor = 1.0 if mean_latency is None else max(0.0, 1 - mean_latency / (2 * self.slow_call_seconds))
+            score = (1 - self._error_rate()) * latency_factor
+            return round(score * (0.5 if self.state == self.HALF_OPEN else 1.0), 3)
+
+    def status(self):
+        health = self.health_score()
+        with self._lock:
+            mean_latency = self._mean_latency()
+            return {
+                'state': self.state,
+                'health': health,
+                'error_rate': round(self._error_rate(), 3),
+                'mean_latency': round(mean_latency, 2) if mean_latency is not None else None,
+                'calls_in_window': len(self.window)
+            }
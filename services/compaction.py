@@ -0,0 +1,104 @@
+"""Shrink article text before it is sent to the AI.
+
+Removes boilerplate lines that carry no story content, collapses whitespace
+and cuts on a sentence boundary to fit a token budget.
+"""
+import re
+
+_TOKEN = re.compile(r"\w+|[^\w\s]")
+
+_BOILERPLATE_LINE = re.compile(
+    r"^\s*(?:"
+    r"related(?: articles?| stories| posts)?\s*:|"
+    r"read (?:more|next|also)\s*:|"
+    r"see also\s*:|"
+    r"(?:image|photo|video)s?\s*(?:credit|via|courtesy|source)s?\b|"
+    r"(?:photo|image) by\b|"
+    r"credit\s*:|"
+    r"(?:sign up|subscribe)\b.*\bnewsletter|"
+    r".*\bnewsletter\b.*\b(?:sign up|subscribe|inbox)\b|"
+    r"follow us on\b|"
+    r"click here\b|"
+    r"advertisement\s*$|"
+    r"scroll to continue\b"
+    r")",
+    re.IGNORECASE
+)
+
+_SENTENCE_END = re.compile(r"(?<=[.!?…])[\"'”’)]*\s+")
+
+
+def estimate_tokens(text):
+    """Local approximation of the Gemini token count.
+
+    Counts words and punctuation marks, with long words adding one extra
+    token per four characters beyond the first six (subword pieces).
+    """
+    if not text:
+        return 0
+    tokens = 0
+    for match in _TOKEN.finditer(text):
+        piece = match.group()
+        tokens += 1 + max(0, len(piece) - 6) // 4
+    return tokens
+
+
+def remove_boilerplate(text):
+    """Drop boilerplate lines and repeated short lines (sign-offs, captions)"""
+    kept = []
+    seen_short = set()
+    for line in text.splitlines():
+        stripped = line.strip()
+        if _BOILERPLATE_LINE.match(stripped):
+            continue
+        if stripped and len(stripped) < 120:
+            normalized = stripped.lower()
+            if normalized in seen_short:
+                continue
+            seen_short.add(normalized)
+        kept.append(line)
+    return '\n'.join(kept)
+
+
+def collapse_whitespace(text):
+    text = re.sub(r"[ \t ]+", " ", text)
+    text = re.sub(r" *\n *", "\n", text)
+    return re.sub(r"\n{3,}", "\n\n", text).strip()
+
+
+def truncate_to_tokens(text, max_tokens):
+    """Keep whole sentences from the start of text until max_tokens is reached"""
+    if estimate_tokens(text) <= max_tokens:
+        return text
+
+    kept, used, position = [], 0, 0
+    for match in _SENTENCE_END.finditer(text):
+        sentence = text[position:match.end()]
+        cost = estimate_tokens(sentence)
+        if used + cost > max_tokens:
+            break
+        kept.append(sentence)
+        used += cost
+        position = match.end()
+    else:
+        tail = text[position:]
+        if used + estimate_tokens(tail) <= max_tokens:
+            kept.append(tail)
+
+    if not kept:
+        # A single sentence over budget: fall back to cutting on a word boundary
+        words, used = [], 0
+        for word in text.split(' '):
+            used += estimate_tokens(word)
+            if used > max_tokens:
+                break
+            words.append(word)
+        return ' '.join(words)
+    return ''.join(kept).rstrip()
+
+
+def compact_text(text, max_tokens):
+    """Boilerplate removal, whitespace collapse and sentence-boundary truncation"""
+    if not text:
+        return text
+    return truncate_to_tokens(collapse_whitespace(remove_boilerplate(text)), max_tokens)
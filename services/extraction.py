@@ -0,0 +1,83 @@
+"""CPU-bound HTML parsing helpers.
+
+These are plain module-level functions so they can be shipped to worker
+processes by RSSMonitor's ProcessPoolExecutor. Keep this module free of
+Flask/database imports: worker processes only need the parsers.
+"""
+import re
+from html.parser import HTMLParser
+import trafilatura
+
+MAX_CONTENT_LENGTH = 5000
+
+_IMAGE_EXTENSION = re.compile(r'\.(?:jpe?g|png|webp|gif)(?:$|[?#&/])', re.IGNORECASE)
+
+
+def extract_article_text(html):
+    """Extract the main article text from raw page HTML"""
+    content = trafilatura.extract(html)
+    return content[:MAX_CONTENT_LENGTH] if content else None  # Limit content length
+
+
+class _FirstImageFound(Exception):
+    pass
+
+
+class _FirstImageParser(HTMLParser):
+    """Streaming tokenizer that stops at the first <img> tag"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.attrs = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'img':
+            self.attrs = dict(attrs)
+            raise _FirstImageFound
+
+
+def _largest_srcset_candidate(srcset):
+    """Pick the URL with the largest width (or density) descriptor from a srcset"""
+    best_url, best_size = None, -1.0
+    for candidate in srcset.split(','):
+        parts = candidate.strip().split()
+        if not parts:
+            continue
+        size = 0.0
+        if len(parts) > 1 and parts[1][-1:] in ('w', 'x'):
+            try:
+                size = float(parts[1][:-1])
+            except ValueError:
+                size = 0.0
+        if size > best_size:
+            best_url, best_size = parts[0], size
+    return best_url
+
+
+def extract_summary_image(summary_html):
+    """Return the best image URL of the first <img> in an RSS entry summary.
+
+    Tokenizing stops as soon as the first <img> is seen. When the tag has a
+    srcset, its largest candidate wins over src.
+    """
+    parser = _FirstImageParser()
+    try:
+        parser.feed(summary_html)
+        parser.close()
+    except _FirstImageFound:
+        pass
+
+    attrs = parser.attrs
+    if not attrs:
+        return None
+
+    if attrs.get('srcset'):
+        image_url = _largest_srcset_candidate(attrs['srcset'])
+        if image_url:
+            return image_url
+    return attrs.get('src') or attrs.get('data-src') or None
+
+
+def has_image_extension(url):
+    """Check that a URL points to a known image type (extension followed by end, query or fragment)"""
+    return bool(_IMAGE_EXTENSION.search(url))
@@ -0,0 +1,99 @@
+"""Feed cursor bookkeeping: which entries are new, and where to resume after failures.
+
+Plain functions over a Feed-like state object (last_entry_published_at,
+last_entry_id, backlog_pending, entry_retries) so they can be tested without
+a database.
+"""
+import json
+from datetime import datetime
+
+
+def entry_published_at(entry):
+    """Publication time of a feed entry as naive UTC, if the feed provides one"""
+    parsed = entry.get('published_parsed') or entry.get('updated_parsed')
+    return datetime(*parsed[:6]) if parsed else None
+
+
+def entry_id(entry):
+    return (entry.get('id') or entry.link)[:500]
+
+
+def _sort_key(entry):
+    """Oldest first; entries sharing a timestamp are ordered by id so the cursor can sit between them"""
+    published_at = entry_published_at(entry)
+    return (published_at, entry_id(entry)) if published_at else (datetime.min, '')
+
+
+def select_entries(state, entries, batch_size, first_poll_size, now=None):
+    """Pick the next batch of entries past the feed cursor and advance it.
+
+    Returns (entry, previous_cursor) pairs, oldest first, where previous_cursor
+    is the (published_at, entry_id) cursor just before that entry, together
+    with the total number of entries found past the cursor. state.backlog_pending
+    is set when more entries than one batch are waiting. Entries dated in the
+    future are left alone until they are due, so the cursor never passes the
+    real entries published before them.
+    """
+    now = now or datetime.utcnow()
+    entries = [
+        entry for entry in entries
+        if entry.get('link') and not (entry_published_at(entry) and entry_published_at(entry) > now)
+    ]
+
+    if state.last_entry_published_at is None and not state.last_entry_id:
+        # First poll: start from the most recent entries instead of the whole feed history
+        newer = entries[:first_poll_size]
+    else:
+        newer = []
+        cursor = (state.last_entry_published_at, state.last_entry_id or '')
+        for entry in entries:
+            published_at = entry_published_at(entry)
+            if published_at and state.last_entry_published_at:
+                if (published_at, entry_id(entry)) > cursor:
+                    newer.append(entry)
+            elif entry_id(entry) == state.last_entry_id:
+                break  # Feeds without dates are newest first: stop at the cursor
+            else:
+                newer.append(entry)
+
+    # Oldest first, so the cursor only ever moves forward
+    newer.reverse()
+    newer.sort(key=_sort_key)
+
+    batch = newer[:batch_size]
+    state.backlog_pending = len(newer) > batch_size
+
+    selected = []
+    for entry in batch:
+        selected.append((entry, (state.last_entry_published_at, state.last_entry_id)))
+        state.last_entry_id = entry_id(entry)
+        published_at = entry_published_at(entry)
+        if published_at:
+            state.last_entry_published_at = published_at
+
+    return selected, len(newer)
+
+
+def plan_rewind(state, failures, max_retries):
+    """Decide where the cursor goes back to after entries failed to extract.
+
+    failures are (previous_cursor, entry_id) pairs, oldest first. Each entry is
+    retried at most max_retries times; after that it is skipped so a page that
+    never extracts cannot block the entries behind it. Attempt counts are kept
+    in state.entry_retries (JSON). Returns (cursor to rewind to or None, skipped
+    entry ids).
+    """
+    retries = json.loads(state.entry_retries) if state.entry_retries else {}
+    attempted = {}
+    cursor, skipped = None, []
+    for previous_cursor, failed_id in failures:
+        attempts = retries.get(failed_id, 0) + 1
+        if attempts > max_retries:
+            skipped.append(failed_id)
+            continue
+        attempted[failed_id] = attempts
+        if cursor is None:
+            cursor = previous_cursor
+
+    state.entry_retries = json.dumps(attempted) if attempted else None
+    return cursor, skipped
@@ -0,0 +1,98 @@
+import logging
+import os
+import tempfile
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class LruFileStore:
+    """Size-bounded on-disk store of byte blobs, one file per key, evicted least recently used first.
+
+    Keys are hex digests; files are spread over two-character subdirectories.
+    Reads refresh a file's modification time. Once the store grows past
+    max_size_bytes, files older than ttl_seconds (if set) and then the least
+    recently used ones are deleted until it is back under 90% of the limit.
+    """
+
+    def __init__(self, directory, suffix, max_size_bytes, ttl_seconds=None, name='File store'):
+        self.directory = directory
+        self.suffix = suffix
+        self.max_size_bytes = max_size_bytes
+        self.ttl_seconds = ttl_seconds
+        self.name = name
+        self._lock = threading.Lock()
+        self._size = None
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], f"{key}{self.suffix}")
+
+    def read(self, key):
+        """Return the stored bytes for key, or None; other read errors are raised"""
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+        os.utime(path)  # Mark as recently used
+        return data
+
+    def write(self, key, data):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        # Write to a temp file first so readers never see a partial entry
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+
+        with self._lock:
+            self._ensure_size()
+            previous = os.path.getsize(path) if os.path.exists(path) else 0
+            os.replace(tmp_path, path)
+            self._size += len(data) - previous
+            if self._size > self.max_size_bytes:
+                self._evict()
+
+    def remove(self, key):
+        path = self._path(key)
+        try:
+            size = os.path.getsize(path)
+            os.remove(path)
+            with self._lock:
+                if self._size is not None:
+                    self._size -= size
+        except FileNotFoundError:
+            pass
+
+    def _entries(self):
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if name.endswith(self.suffix):
+                    path = os.path.join(root, name)
+                    try:
+                        stat = os.stat(path)
+                    except FileNotFoundError:
+                        continue
+                    yield path, stat.st_mtime, stat.st_size
+
+    def _ensure_size(self):
+        if self._size is None:
+            self._size = sum(size for _, _, size in self._entries())
+
+    def _evict(self):
+        target = self.max_size_bytes * 0.9
+        expires_before = time.time() - self.ttl_seconds if self.ttl_seconds else 0
+        removed = 0
+        for path, mtime, size in sorted(self._entries(), key=lambda item: item[1]):
+            if self._size <= target and mtime >= expires_before:
+                break
+            try:
+                os.remove(path)
+                self._size -= size
+                removed += 1
+            except FileNotFoundError:
+                continue
+        logger.info(f"{self.name} evicted {removed} entries")
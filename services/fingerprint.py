@@ -0,0 +1,55 @@
+import hashlib
+import re
+from collections import Counter
+
+SIMHASH_BITS = 64
+SIMHASH_BANDS = 4  # signatures within SIMHASH_BANDS - 1 bits share at least one band
+_MASK = (1 << SIMHASH_BITS) - 1
+_BAND_BITS = SIMHASH_BITS // SIMHASH_BANDS
+
+
+def simhash(text, shingle_size=3):
+    """Compute a 64-bit SimHash of text using word shingles as features.
+
+    The value is returned as a signed integer so it fits a BIGINT column.
+    """
+    tokens = re.findall(r'\w+', (text or '').lower())
+    if len(tokens) >= shingle_size:
+        features = Counter(
+            ' '.join(tokens[i:i + shingle_size]) for i in range(len(tokens) - shingle_size + 1)
+        )
+    else:
+        features = Counter(tokens)
+
+    weights = [0] * SIMHASH_BITS
+    for feature, count in features.items():
+        h = int.from_bytes(hashlib.blake2b(feature.encode('utf-8'), digest_size=8).digest(), 'big')
+        for bit in range(SIMHASH_BITS):
+            weights[bit] += count if (h >> bit) & 1 else -count
+
+    value = 0
+    for bit in range(SIMHASH_BITS):
+        if weights[bit] > 0:
+            value |= 1 << bit
+
+    # Store as signed 64-bit
+    return value - (1 << SIMHASH_BITS) if value >= 1 << (SIMHASH_BITS - 1) else value
+
+
+def hamming_distance(a, b):
+    """Number of differing bits between two SimHash values"""
+    return bin((a ^ b) & _MASK).count('1')
+
+
+def simhash_bands(signature):
+    """Split a SimHash into SIMHASH_BANDS 16-bit values for indexed candidate lookup"""
+    value = signature & _MASK
+    return [(value >> (band * _BAND_BITS)) & ((1 << _BAND_BITS) - 1) for band in range(SIMHASH_BANDS)]
+
+
+def find_near_duplicate(signature, candidates, max_distance=3):
+    """Return the key of the first (key, signature) candidate within max_distance, or None"""
+    for key, other in candidates:
+        if other is not None and hamming_distance(signature, other) <= max_distance:
+            return key
+    return None
@@ -0,0 +1,37 @@
+import gzip
+import hashlib
+import logging
+from services.file_store import LruFileStore
+
+logger = logging.getLogger(__name__)
+
+
+class HtmlCache:
+    """Content-addressed, gzip-compressed on-disk cache of raw article HTML.
+
+    Entries are keyed by the SHA-256 of the URL and kept in a size-bounded
+    LruFileStore.
+    """
+
+    def __init__(self, directory, max_size_bytes):
+        self.store = LruFileStore(directory, '.html.gz', max_size_bytes, name='HTML cache')
+
+    @staticmethod
+    def _key(url):
+        return hashlib.sha256(url.encode('utf-8')).hexdigest()
+
+    def get(self, url):
+        """Return cached HTML bytes for url, or None"""
+        try:
+            data = self.store.read(self._key(url))
+            return gzip.decompress(data) if data is not None else None
+        except Exception as e:
+            logger.warning(f"Error reading HTML cache for {url}: {str(e)}")
+            return None
+
+    def put(self, url, html):
+        """Store raw HTML bytes for url"""
+        try:
+            self.store.write(self._key(url), gzip.compress(html, compresslevel=6))
+        except Exception as e:
+            logger.warning(f"Error writing HTML cache for {url}: {str(e)}")
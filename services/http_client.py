@@ -0,0 +1,39 @@
+import logging
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from config import HTTP_CONFIG, USER_AGENT
+
+logger = logging.getLogger(__name__)
+
+
+def create_session():
+    """Create a pooled keep-alive session with retry/backoff for outbound GETs"""
+    retry = Retry(
+        total=HTTP_CONFIG['retries'],
+        backoff_factor=HTTP_CONFIG['backoff_factor'],
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=['GET', 'HEAD'],
+        respect_retry_after_header=True
+    )
+    adapter = HTTPAdapter(
+        pool_connections=HTTP_CONFIG['pool_connections'],
+        pool_maxsize=HTTP_CONFIG['pool_maxsize'],
+        max_retries=retry
+    )
+
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.headers.update({'User-Agent': USER_AGENT})
+    return session
+
+
+def fetch_html(session, url):
+    """Download a page through the shared session and return its raw bytes"""
+    response = session.get(
+        url,
+        timeout=(HTTP_CONFIG['connect_timeout'], HTTP_CONFIG['read_timeout'])
+    )
+    response.raise_for_status()
+    return response.content
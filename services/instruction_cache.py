@@ -0,0 +1,68 @@
+import hashlib
+import logging
+import time
+from google.genai import types
+
+logger = logging.getLogger(__name__)
+
+
+class InstructionCache:
+    """One Gemini cached-content entry per API key and model holding the static system instruction.
+
+    Entries are recreated when the instruction text changes (tracked by hash) or
+    when they are close to expiring. If the API refuses to cache the instruction
+    (e.g. it is below the model's minimum cacheable size), that key falls back to
+    sending it as a plain system_instruction until the text changes.
+    """
+
+    def __init__(self, ttl_seconds, refresh_margin=600):
+        self.ttl_seconds = ttl_seconds
+        self.refresh_margin = refresh_margin
+        self.entries = {}  # (key name, model) -> (instruction hash, cache name, expires at)
+        self.unsupported = {}  # (key name, model) -> instruction hash that could not be cached
+
+    @staticmethod
+    def _hash(instruction):
+        return hashlib.sha256(instruction.encode('utf-8')).hexdigest()[:16]
+
+    def get(self, key_name, model):
+        """Cached-content name to use for key_name and model, or None to send the instruction inline"""
+        entry = self.entries.get((key_name, model))
+        if entry and time.monotonic() < entry[2]:
+            return entry[1]
+        return None
+
+    async def refresh(self, clients, instruction, models):
+        """Make sure every client has a current cache entry for each model; call before a processing run"""
+        instruction_hash = self._hash(instruction)
+        for (key_name, client), model in ((item, model) for item in clients.items() for model in models):
+            entry_key = (key_name, model)
+            if self.unsupported.get(entry_key) == instruction_hash:
+                continue
+            entry = self.entries.get(entry_key)
+            if entry and entry[0] == instruction_hash and time.monotonic() < entry[2] - self.refresh_margin:
+                continue
+
+            try:
+                cached = await client.aio.caches.create(
+                    model=model,
+                    config=types.CreateCachedContentConfig(
+                        system_instruction=instruction,
+                        display_name=f"instructions-{instruction_hash}",
+                        ttl=f"{self.ttl_seconds}s"
+                    )
+                )
+            except Exception as e:
+                logger.warning(f"Could not cache system instruction for {key_name} ({model}), sending it inline: {str(e)}")
+                self.unsupported[entry_key] = instruction_hash
+                self.entries.pop(entry_key, None)
+                continue
+
+            self.entries[entry_key] = (instruction_hash, cached.name, time.monotonic() + self.ttl_seconds)
+            logger.info(f"Cached system instruction for {key_name} ({model}) as {cached.name}")
+
+            if entry and entry[0] != instruction_hash:
+                try:
+                    await client.aio.caches.delete(name=entry[1])
+                except Exception as e:
+                    logger.debug(f"Could not delete stale instruction cache {entry[1]}: {str(e)}")
@@ -0,0 +1,160 @@
+import asyncio
+import logging
+import threading
+import time
+from services.circuit_breaker import CircuitBreaker
+
+logger = logging.getLogger(__name__)
+
+
+class QuotaExhausted(Exception):
+    """No API key had quota left within the allowed wait"""
+
+
+class TokenBucket:
+    """Bucket holding up to `per_minute` units, refilled continuously over 60 seconds"""
+
+    def __init__(self, per_minute):
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self.level = self.capacity
+        self.updated_at = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def available(self):
+        self._refill()
+        return self.level
+
+    def can_take(self, amount):
+        # A request larger than the whole bucket is allowed once the bucket is full
+        return self.available() >= min(amount, self.capacity)
+
+    def take(self, amount):
+        self._refill()
+        self.level -= amount
+
+    def give_back(self, amount):
+        self._refill()
+        self.level = min(self.capacity, self.level + amount)
+
+    def wait_time(self, amount):
+        needed = min(amount, self.capacity) - self.available()
+        return max(0.0, needed / self.rate) if self.rate else float('inf')
+
+
+class ApiKey:
+    def __init__(self, name, pool, client, requests_per_minute, tokens_per_minute, weight=1.0, breaker=None):
+        self.name = name
+        self.pool = pool
+        self.client = client
+        self.weight = weight
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.breaker = breaker or CircuitBreaker()
+        self.in_flight = 0
+        self.total_requests = 0
+
+    def has_capacity(self, estimated_tokens):
+        return self.breaker.is_available() and self.requests.can_take(1) and self.tokens.can_take(estimated_tokens)
+
+    def load(self):
+        """Weighted load: in-flight calls per unit of weight, plus how much of the minute's quota is used"""
+        used = 1 - self.requests.available() / self.requests.capacity
+        return (self.in_flight + used) / self.weight
+
+
+class KeyPool:
+    """Hands out Gemini API keys by least weighted load, within per-key rate limits.
+
+    Keys whose circuit breaker is open are skipped. Keys of the requested pool are preferred; when all of them are exhausted
+    the other pools are used as fallback (e.g. cinema <-> series).
+    """
+
+    def __init__(self, cross_pool_fallback=True, max_wait=60):
+        self.keys = {}
+        self.cross_pool_fallback = cross_pool_fallback
+        self.max_wait = max_wait
+        self._lock = threading.Lock()
+
+    def add(self, key):
+        self.keys[key.name] = key
+
+    def _candidates(self, pool, exclude):
+        own = [key for key in self.keys.values() if key.pool == pool and key.name not in exclude]
+        if not self.cross_pool_fallback:
+            return [own]
+        others = [key for key in self.keys.values() if key.pool != pool and key.name not in exclude]
+        return [own, others]
+
+    def _try_acquire(self, pool, estimated_tokens, exclude):
+        """Return (key, None) on success, or (None, seconds to wait) / (None, None) if no key is left"""
+        with self._lock:
+            groups = self._candidates(pool, exclude)
+            if not any(groups):
+                return None, None
+
+            for group in groups:
+                ready = [key for key in group if key.has_capacity(estimated_tokens)]
+                if ready:
+                    key = min(ready, key=lambda k: k.load())
+                    key.breaker.on_acquire()
+                    key.requests.take(1)
+                    key.tokens.take(estimated_tokens)
+                    key.in_flight += 1
+                    key.total_requests += 1
+                    return key, None
+
+            wait = min(
+                max(key.breaker.retry_in(), key.requests.wait_time(1), key.tokens.wait_time(estimated_tokens))
+                for group in groups for key in group
+            )
+            # A half-open key with its probe in flight reports no wait: poll again shortly
+            wait = max(wait, 0.5)
+            return None, wait
+
+    def try_acquire(self, pool, estimated_tokens, exclude=()):
+        """Return a key with quota right now, or None without waiting"""
+        key, _ = self._try_acquire(pool, estimated_tokens, exclude)
+        return key
+
+    async def acquire(self, pool, estimated_tokens, exclude=()):
+        """Wait for a key with quota. Returns None once every key was excluded."""
+        waited = 0.0
+        while True:
+            key, wait = self._try_acquire(pool, estimated_tokens, exclude)
+            if key or wait is None:
+                return key
+            if waited + wait > self.max_wait:
+                raise QuotaExhausted(f"No {pool} API key with quota available")
+            logger.debug(f"All {pool} keys throttled, waiting {wait:.1f}s")
+            await asyncio.sleep(wait)
+            waited += wait
+
+    def release(self, key, estimated_tokens, used_tokens=None):
+        """Return a key after a call, correcting the token estimate with the real usage"""
+        with self._lock:
+            key.in_flight -= 1
+            if used_tokens is not None:
+                difference = estimated_tokens - used_tokens
+                if difference > 0:
+                    key.tokens.give_back(difference)
+                else:
+                    key.tokens.take(-difference)
+
+    def status(self):
+        with self._lock:
+            return {
+                key.name: {
+                    'pool': key.pool,
+                    'in_flight': key.in_flight,
+                    'total_requests': key.total_requests,
+                    'requests_available': int(key.requests.available()),
+                    'tokens_available': int(key.tokens.available()),
+                    **key.breaker.status()
+                }
+                for key in self.keys.values()
+            }
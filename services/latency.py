@@ -0,0 +1,32 @@
+import threading
+from collections import deque
+
+
+class LatencyTracker:
+    """Sliding window of recent call latencies (seconds) with percentile queries"""
+
+    def __init__(self, window=200):
+        self.samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, latency):
+        with self._lock:
+            self.samples.append(latency)
+
+    def __len__(self):
+        return len(self.samples)
+
+    def percentile(self, q):
+        """Nearest-rank percentile for q in (0, 1]; None without samples"""
+        with self._lock:
+            if not self.samples:
+                return None
+            ordered = sorted(self.samples)
+        index = min(len(ordered) - 1, max(0, int(round(q * len(ordered))) - 1))
+        return ordered[index]
+
+    def mean_above(self, threshold):
+        """Mean of the samples slower than threshold, or None if there are none"""
+        with self._lock:
+            slow = [latency for latency in self.samples if latency > threshold]
+        return sum(slow) / len(slow) if slow else None
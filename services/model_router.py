@@ -0,0 +1,119 @@
+import logging
+import threading
+import time
+from collections import deque
+from services.latency import LatencyTracker
+
+logger = logging.getLogger(__name__)
+
+
+class _ModelStats:
+    def __init__(self, window):
+        self.latencies = LatencyTracker(window)
+        self.outcomes = deque(maxlen=window)
+        self.calls = 0
+        self.failures = 0
+
+    def failure_rate(self):
+        return sum(1 for success in self.outcomes if not success) / len(self.outcomes) if self.outcomes else 0.0
+
+
+class ModelRouter:
+    """Picks the Gemini model for an article from ordered routing rules.
+
+    A route matches on feed type ('feeds') and/or content size ('min_tokens',
+    'max_tokens'); the first match wins. Every model keeps latency and failure
+    statistics. A route whose model goes over the p95 latency or failure-rate
+    limits is demoted to its 'fallback' route for demote_seconds, after which its
+    statistics are reset and it gets traffic again.
+    """
+
+    def __init__(self, routes, default_model, p95_latency_limit=45, max_failure_rate=0.25,
+                 min_samples=20, demote_seconds=900, window=100):
+        self.routes = routes or [{'name': 'default', 'model': default_model}]
+        self.routes_by_name = {route['name']: route for route in self.routes}
+        self.p95_latency_limit = p95_latency_limit
+        self.max_failure_rate = max_failure_rate
+        self.min_samples = min_samples
+        self.demote_seconds = demote_seconds
+        self.window = window
+        self.stats = {}
+        self.demoted_until = {}
+        self._lock = threading.Lock()
+
+    def models(self):
+        return sorted({route['model'] for route in self.routes})
+
+    def _matches(self, route, feed_type, tokens):
+        if 'feeds' in route and feed_type not in route['feeds']:
+            return False
+        if 'min_tokens' in route and tokens < route['min_tokens']:
+            return False
+        if 'max_tokens' in route and tokens > route['max_tokens']:
+            return False
+        return True
+
+    def choose(self, feed_type, tokens):
+        """Return (route name, model) for an article of feed_type with about tokens of content"""
+        route = next((r for r in self.routes if self._matches(r, feed_type, tokens)), self.routes[-1])
+        visited = {route['name']}
+        while self._is_demoted(route) and route.get('fallback') in self.routes_by_name:
+            route = self.routes_by_name[route['fallback']]
+            if route['name'] in visited:
+                break
+            visited.add(route['name'])
+        return route['name'], route['model']
+
+    def _stats(self, model):
+        if model not in self.stats:
+            self.stats[model] = _ModelStats(self.window)
+        return self.stats[model]
+
+    def _is_demoted(self, route):
+        with self._lock:
+            name, now = route['name'], time.monotonic()
+            until = self.demoted_until.get(name)
+            if until is not None:
+                if now < until:
+                    return True
+                # Demotion over: start measuring the route afresh
+                del self.demoted_until[name]
+                self.stats[route['model']] = _ModelStats(self.window)
+                return False
+
+            stats = self._stats(route['model'])
+            if len(stats.outcomes) < self.min_samples:
+                return False
+            p95 = stats.latencies.percentile(0.95)
+            failure_rate = stats.failure_rate()
+            if (p95 is not None and p95 > self.p95_latency_limit) or failure_rate > self.max_failure_rate:
+                self.demoted_until[name] = now + self.demote_seconds
+                logger.warning(f"Route {name} ({route['model']}) demoted for {self.demote_seconds}s: "
+                               f"p95 {p95:.1f}s, failure rate {failure_rate:.0%}")
+                return True
+            return False
+
+    def record(self, model, latency, success):
+        with self._lock:
+            stats = self._stats(model)
+            stats.latencies.record(latency)
+            stats.outcomes.append(success)
+            stats.calls += 1
+            if not success:
+                stats.failures += 1
+
+    def status(self):
+        with self._lock:
+            status = {}
+            for route in self.routes:
+                stats = self._stats(route['model'])
+                p95 = stats.latencies.percentile(0.95)
+                status[route['name']] = {
+                    'model': route['model'],
+                    'calls': stats.calls,
+                    'failures': stats.failures,
+                    'failure_rate': round(stats.failure_rate(), 3),
+                    'p95_latency': round(p95, 2) if p95 is not None else None,
+                    'demoted': route['name'] in self.demoted_until
+                }
+            return status
@@ -1,78 +1,499 @@
 import feedparser
-import requests
-import trafilatura
+import gzip
+import json
 import logging
+import multiprocessing
+import os
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime, timedelta
 from app import db, app  # Importando o app para usar o contexto
-from models import Article
-from config import RSS_FEEDS, USER_AGENT
-from bs4 import BeautifulSoup
+from models import Article, Feed, ProcessingLog
+from config import RSS_FEEDS, USER_AGENT, SCHEDULE_CONFIG, DEDUP_CONFIG, HTML_CACHE_CONFIG, CLEANUP_CONFIG, WEBSUB_CONFIG
+from services.fingerprint import simhash, simhash_bands, find_near_duplicate, SIMHASH_BANDS
+from services.seen_urls import SeenUrlFilter
+from services.http_client import create_session, fetch_html
+from services.html_cache import HtmlCache
+from services.extraction import extract_article_text, extract_summary_image, has_image_extension
+from services import websub, feed_cursor
 
 logger = logging.getLogger(__name__)
 
 class RSSMonitor:
     def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({'User-Agent': USER_AGENT})
+        self.session = create_session()
+        self.html_cache = HtmlCache(
+            HTML_CACHE_CONFIG['directory'], HTML_CACHE_CONFIG['max_size_mb'] * 1024 * 1024
+        ) if HTML_CACHE_CONFIG['enabled'] else None
+        self.seen_filter = SeenUrlFilter(max_size=SCHEDULE_CONFIG.get('seen_url_cache_size', 5000))
+        self._parse_pool = None
+        self._parse_pool_lock = threading.Lock()
+        self._ingest_lock = threading.RLock()  # Serializes polling and WebSub pushes (shared feed cursors)
 
-    def fetch_new_articles(self):
-        """Fetch new articles from RSS feeds"""
-        new_articles = []
+    def warm_seen_filter(self):
+        """Load the most recent article URLs into the in-memory seen filter"""
+        try:
+            with app.app_context():
+                rows = db.session.query(Article.original_url).order_by(
+                    Article.created_at.desc()
+                ).limit(self.seen_filter.max_size).all()
+            # Oldest first so the newest URLs are the last to be evicted
+            self.seen_filter.update(row.original_url for row in reversed(rows))
+            logger.info(f"Seen URL filter warmed with {len(rows)} URLs")
+        except Exception as e:
+            logger.error(f"Error warming seen URL filter: {str(e)}")
 
-        for feed_type, feed_url in RSS_FEEDS.items():
-            try:
-                logger.info(f"Fetching {feed_type} feed from {feed_url}")
-                feed = feedparser.parse(feed_url)
-
-                if feed.bozo:
-                    logger.warning(f"Feed parsing warning for {feed_type}: {feed.bozo_exception}")
-
-                for entry in feed.entries[:3]:  # Limit to 3 most recent per feed
-                    if not self._article_exists(entry.link):
-                        article_content = self._extract_content(entry.link)
-                        featured_image_url = self._extract_featured_image(entry)
-                        if article_content:
-                            article = Article(
-                                original_url=entry.link,
-                                original_title=entry.title,
-                                original_content=article_content,
-                                feed_type=feed_type,
-                                status='pending',
-                                featured_image_url=featured_image_url
-                            )
-                            new_articles.append(article)
-                            logger.info(f"New article found: {entry.title}")
-
-            except Exception as e:
-                logger.error(f"Error fetching {feed_type} feed: {str(e)}")
+    def shutdown(self):
+        """Stop the parsing worker processes"""
+        with self._parse_pool_lock:
+            if self._parse_pool is not None:
+                self._parse_pool.shutdown(wait=False, cancel_futures=True)
+                self._parse_pool = None
+
+    def fetch_new_articles(self, due_only=False):
+        """Fetch new articles from RSS feeds (only feeds whose poll is due when due_only)"""
+        with self._ingest_lock:
+            feed_states = self._get_feed_states(due_only)
+            if not feed_states:
+                return 0
+
+            seen_urls = set()
+            content_futures = []
+
+            # A single pool bounds every network call of the cycle (feeds and article pages)
+            with ThreadPoolExecutor(max_workers=self._max_workers()) as executor:
+                feed_futures = {
+                    # While draining a backlog the feed must be downloaded even if unchanged
+                    executor.submit(
+                        self._fetch_feed, feed_type, state.url,
+                        None if state.backlog_pending else state.etag,
+                        None if state.backlog_pending else state.last_modified
+                    ): feed_type
+                    for feed_type, state in feed_states.items()
+                }
+
+                for future in as_completed(feed_futures):
+                    feed_type = feed_futures[future]
+                    try:
+                        feed = future.result()
+                        state = feed_states[feed_type]
+                        previous_fetch_at = state.last_fetched_at
+                        self._update_feed_state(state, feed)
+
+                        if feed.get('status') == 304:
+                            logger.info(f"{feed_type} feed not modified since last check")
+                            self._schedule_next_poll(state, 0, previous_fetch_at)
+                            continue
+
+                        newer_count = self._queue_new_entries(
+                            feed_type, state, feed, executor, seen_urls, content_futures
+                        )
+                        self._schedule_next_poll(state, newer_count, previous_fetch_at)
+
+                    except Exception as e:
+                        logger.error(f"Error fetching {feed_type} feed: {str(e)}")
+                        self._schedule_next_poll(feed_states[feed_type], None, None)
+
+                self._commit_feed_states()
+                collected = self._collect_articles(content_futures)
+
+            return self._save_new_articles(collected, feed_states)
+
+    def ingest_pushed_feed(self, feed_type, feed):
+        """Run entries pushed by a WebSub hub through the same ingestion path as polling"""
+        with self._ingest_lock:
+            state = Feed.query.filter_by(feed_type=feed_type).first()
+            if state is None or state.enabled is False:
+                logger.warning(f"Ignoring WebSub push for unknown feed: {feed_type}")
+                return 0
+
+            # Only entries that link back to the feed's own site are trusted
+            entries = [entry for entry in feed.entries if websub.same_host(entry.get('link'), state.url)]
+            if len(entries) < len(feed.entries):
+                logger.warning(f"WebSub push for {feed_type}: ignored {len(feed.entries) - len(entries)} off-site entries")
+            feed['entries'] = entries
+
+            content_futures = []
+            with ThreadPoolExecutor(max_workers=self._max_workers()) as executor:
+                self._queue_new_entries(feed_type, state, feed, executor, set(), content_futures)
+                self._commit_feed_states()
+                collected = self._collect_articles(content_futures)
+
+            saved = self._save_new_articles(collected, {feed_type: state})
+            logger.info(f"WebSub push for {feed_type}: {saved} new articles")
+            return saved
+
+    def _max_workers(self):
+        return max(1, SCHEDULE_CONFIG.get('fetch_concurrency', 8))
+
+    def _queue_new_entries(self, feed_type, state, feed, executor, seen_urls, content_futures):
+        """Select entries past the cursor, drop known URLs and queue page downloads.
+
+        Returns the number of entries found past the cursor.
+        """
+        # Only entries past the feed cursor; dedup them with one query per feed
+        entries, newer_count = self._select_entries(feed_type, state, feed)
+        new_urls = self.seen_filter.unseen({entry.link for entry, _ in entries} - seen_urls)
+        existing_urls = self._existing_urls(new_urls)
+        self.seen_filter.update(existing_urls)
+        new_urls -= existing_urls
+
+        for entry, previous_cursor in entries:
+            if entry.link not in new_urls or entry.link in seen_urls:
+                continue
+            seen_urls.add(entry.link)
+            content_futures.append(
+                (feed_type, entry, previous_cursor, executor.submit(self._extract_content, entry.link))
+            )
+
+        return newer_count
+
+    def _commit_feed_states(self):
+        try:
+            db.session.commit()  # Persist feed validators, cursors and statistics
+        except Exception as e:
+            logger.error(f"Error saving feed state: {str(e)}")
+            db.session.rollback()
+
+    def _collect_articles(self, content_futures):
+        """Build Article rows from finished downloads.
+
+        Returns one (feed_type, previous_cursor, entry_id, article) tuple per queued
+        entry, in queue order (oldest first per feed); article is None when the
+        content could not be extracted.
+        """
+        collected = []
+        for feed_type, entry, previous_cursor, future in content_futures:
+            article = None
+            article_content = future.result()
+            if article_content:
+                featured_image_url = self._extract_featured_image(entry)
+                article = Article(
+                    original_url=entry.link,
+                    original_title=entry.title,
+                    original_content=article_content,
+                    feed_type=feed_type,
+                    status='pending',
+                    featured_image_url=featured_image_url
+                )
+                logger.info(f"New article found: {entry.title}")
+            collected.append((feed_type, previous_cursor, feed_cursor.entry_id(entry), article))
+
+        return collected
+
+    def _save_new_articles(self, collected, feed_states):
+        """Save collected articles and rewind feed cursors before every entry that did not make it to the database"""
+        new_articles = [article for _, _, _, article in collected if article is not None]
+        self._mark_near_duplicates(new_articles)
 
         # Save new articles to database
+        saved = set()
         if new_articles:
-            try:
-                with app.app_context():  # Garantindo que o código está no contexto da aplicação
+            urls = {id(article): article.original_url for article in new_articles}  # Rows expire on commit
+            with app.app_context():  # Garantindo que o código está no contexto da aplicação
+                try:
                     db.session.add_all(new_articles)
                     db.session.commit()
-                logger.info(f"Saved {len(new_articles)} new articles to database")
-            except Exception as e:
-                logger.error(f"Error saving articles to database: {str(e)}")
-                db.session.rollback()
+                    saved.update(id(article) for article in new_articles)
+                except Exception as e:
+                    logger.error(f"Error saving articles to database, saving one by one: {str(e)}")
+                    db.session.rollback()
+                    # One bad row (e.g. an over-long field or a URL inserted concurrently) must not lose the batch
+                    for article in new_articles:
+                        try:
+                            db.session.add(article)
+                            db.session.commit()
+                            saved.add(id(article))
+                        except Exception as e:
+                            logger.error(f"Error saving article {urls[id(article)]}: {str(e)}")
+                            db.session.rollback()
+            self.seen_filter.update(urls[article_id] for article_id in saved)
+            logger.info(f"Saved {len(saved)} new articles to database")
+
+        # The cursors already moved past these entries: send them back through the retry logic
+        failed_cursors = {}
+        for feed_type, previous_cursor, entry_id, article in collected:
+            if article is None or id(article) not in saved:
+                failed_cursors.setdefault(feed_type, []).append((previous_cursor, entry_id))
+        self._rewind_cursors(feed_states, failed_cursors)
+
+        return len(saved)
+
+    def renew_websub_subscriptions(self):
+        """Subscribe to the hub of every feed that advertises one and has no fresh lease"""
+        if not websub.push_enabled() or not WEBSUB_CONFIG['callback_base_url']:
+            return 0
+
+        requested = 0
+        with app.app_context():
+            for feed in Feed.query.filter(Feed.enabled.isnot(False), Feed.hub_url.isnot(None)).all():
+                if not websub.needs_renewal(feed):
+                    continue
+                try:
+                    websub.request_subscription(self.session, feed)
+                    requested += 1
+                except Exception as e:
+                    logger.error(f"Error subscribing to WebSub hub for {feed.feed_type}: {str(e)}")
+        return requested
+
+    def _get_feed_states(self, due_only=False):
+        """Load enabled feeds from the feeds table, seeding it from RSS_FEEDS when empty"""
+        if Feed.query.count() == 0:
+            self.seed_feeds()
+
+        query = Feed.query.filter(Feed.enabled.isnot(False))
+        if due_only:
+            now = datetime.utcnow()
+            query = query.filter(db.or_(Feed.next_poll_at.is_(None), Feed.next_poll_at <= now))
+
+        return {feed.feed_type: feed for feed in query.order_by(Feed.id).all()}
+
+    def seed_feeds(self):
+        """Create feeds table rows for RSS_FEEDS entries that are not registered yet"""
+        existing = {feed_type for (feed_type,) in db.session.query(Feed.feed_type).all()}
+        added = 0
+        for feed_type, feed_url in RSS_FEEDS.items():
+            if feed_type not in existing:
+                db.session.add(Feed(
+                    feed_type=feed_type, url=feed_url, enabled=True, fetch_count=0, not_modified_count=0,
+                    backlog_pending=False, poll_interval=SCHEDULE_CONFIG['check_interval']
+                ))
+                added += 1
+        db.session.commit()
+        return added
+
+    def _schedule_next_poll(self, state, new_entries, previous_fetch_at):
+        """Adapt the feed poll interval to its observed publish rate and schedule the next poll.
+
+        new_entries is the number of entries found past the cursor since the
+        previous fetch (None when the fetch failed).
+        """
+        now = datetime.utcnow()
+
+        if new_entries is not None and previous_fetch_at:
+            elapsed_hours = (now - previous_fetch_at).total_seconds() / 3600
+            if elapsed_hours > 0:
+                observed_rate = new_entries / elapsed_hours
+                alpha = SCHEDULE_CONFIG['publish_rate_smoothing']
+                state.publish_rate = observed_rate if state.publish_rate is None \
+                    else alpha * observed_rate + (1 - alpha) * state.publish_rate
 
-        return len(new_articles)
+        if state.publish_rate:
+            interval = SCHEDULE_CONFIG['target_entries_per_poll'] * 60 / state.publish_rate
+        else:
+            interval = state.poll_interval or SCHEDULE_CONFIG['check_interval']
+            if state.publish_rate == 0:
+                interval *= 2  # Nothing published lately: back off until max_poll_interval
+        interval = min(max(interval, SCHEDULE_CONFIG['min_poll_interval']), SCHEDULE_CONFIG['max_poll_interval'])
+        state.poll_interval = int(round(interval))
 
-    def _article_exists(self, url):
-        """Check if article already exists in database"""
-        return Article.query.filter_by(original_url=url).first() is not None
+        if state.backlog_pending:
+            # Catch-up mode drains the backlog as fast as allowed
+            interval = SCHEDULE_CONFIG['min_poll_interval']
+        elif websub.is_subscribed(state):
+            # Pushes deliver new entries; polling is only a safety net
+            interval = SCHEDULE_CONFIG['max_poll_interval']
+
+        jitter = SCHEDULE_CONFIG['poll_jitter']
+        state.next_poll_at = now + timedelta(minutes=interval * random.uniform(1 - jitter, 1 + jitter))
+
+    def _fetch_feed(self, feed_type, feed_url, etag=None, modified=None):
+        """Download and parse a single RSS feed, using conditional GET when possible"""
+        logger.info(f"Fetching {feed_type} feed from {feed_url}")
+        feed = feedparser.parse(feed_url, etag=etag, modified=modified, agent=USER_AGENT)
+
+        if feed.bozo:
+            logger.warning(f"Feed parsing warning for {feed_type}: {feed.bozo_exception}")
+
+        return feed
+
+    def _update_feed_state(self, state, feed):
+        """Record validators and fetch statistics for a feed response"""
+        state.fetch_count = (state.fetch_count or 0) + 1
+        state.last_fetched_at = datetime.utcnow()
+
+        if feed.get('status') == 304:
+            state.not_modified_count = (state.not_modified_count or 0) + 1
+            return
+
+        # Only overwrite validators when the server sent them
+        if feed.get('etag'):
+            state.etag = feed.etag
+        if feed.get('modified'):
+            state.last_modified = feed.modified
+
+        status = feed.get('status')
+        if not status or not 200 <= status < 300 or not feed.get('feed'):
+            return  # Network error or unparsed body: keep the known hub and subscription
+
+        hub_url, self_url = websub.discover_links(feed)
+        if hub_url != state.hub_url:
+            state.hub_url = hub_url
+            state.websub_expires_at = None  # Hub changed or disappeared: subscribe again
+        state.topic_url = self_url or state.url
+
+    def _select_entries(self, feed_type, state, feed):
+        """Pick the next batch of entries past the feed cursor and advance it.
+
+        When more entries than one batch are waiting, the feed switches to
+        catch-up mode and the rest is drained over the following cycles with
+        larger bounded batches (see feed_cursor.select_entries).
+        """
+        batch_size = SCHEDULE_CONFIG['catchup_entries_per_feed'] if state.backlog_pending \
+            else SCHEDULE_CONFIG['entries_per_feed']
+        selected, newer_count = feed_cursor.select_entries(
+            state, feed.entries, batch_size, SCHEDULE_CONFIG['entries_per_feed']
+        )
+        if state.backlog_pending:
+            logger.info(f"{feed_type} feed in catch-up mode: {newer_count - batch_size} entries left")
+        return selected, newer_count
+
+    def _rewind_cursors(self, feed_states, failed_cursors):
+        """Move feed cursors back before entries that could not be extracted or saved.
+
+        Entries that keep failing are given up after max_entry_retries attempts.
+        """
+        try:
+            for feed_type, state in feed_states.items():
+                failures = failed_cursors.get(feed_type)
+                if not failures:
+                    state.entry_retries = None
+                    continue
+
+                cursor, skipped = feed_cursor.plan_rewind(state, failures, SCHEDULE_CONFIG['max_entry_retries'])
+                for entry_id in skipped:
+                    logger.warning(f"{feed_type} entry {entry_id} skipped after "
+                                   f"{SCHEDULE_CONFIG['max_entry_retries']} failed attempts")
+                if cursor is None:
+                    continue
+
+                state.last_entry_published_at, state.last_entry_id = cursor
+                state.backlog_pending = True  # Bypass conditional GET so the entry is retried
+                state.next_poll_at = datetime.utcnow() + timedelta(minutes=SCHEDULE_CONFIG['min_poll_interval'])
+                logger.warning(f"{feed_type} feed cursor rewound to retry failed entries")
+            db.session.commit()
+        except Exception as e:
+            logger.error(f"Error rewinding feed cursors: {str(e)}")
+            db.session.rollback()
+
+    def get_feed_stats(self):
+        """Get polling statistics per feed"""
+        stats = {}
+        for feed in Feed.query.all():
+            fetch_count = feed.fetch_count or 0
+            not_modified = feed.not_modified_count or 0
+            stats[feed.feed_type] = {
+                'url': feed.url,
+                'fetch_count': fetch_count,
+                'not_modified_count': not_modified,
+                'not_modified_rate': round(not_modified / fetch_count, 3) if fetch_count else 0.0,
+                'cursor': feed.last_entry_published_at.isoformat() if feed.last_entry_published_at else feed.last_entry_id,
+                'backlog_pending': bool(feed.backlog_pending),
+                'enabled': feed.enabled is not False,
+                'poll_interval': feed.poll_interval,
+                'publish_rate': round(feed.publish_rate, 2) if feed.publish_rate is not None else None,
+                'next_poll_at': feed.next_poll_at.isoformat() if feed.next_poll_at else None,
+                'hub_url': feed.hub_url,
+                'websub_subscribed': websub.is_subscribed(feed),
+                'last_fetched_at': feed.last_fetched_at.isoformat() if feed.last_fetched_at else None
+            }
+        return stats
+
+    def _mark_near_duplicates(self, articles):
+        """Fingerprint new articles and mark near-duplicates so they never reach the AI"""
+        if not articles:
+            return
+
+        for article in articles:
+            article.content_simhash = simhash(article.original_content)
+            for band, value in enumerate(simhash_bands(article.content_simhash)):
+                setattr(article, f'simhash_band{band}', value)
+
+        try:
+            cutoff_date = datetime.utcnow() - timedelta(hours=DEDUP_CONFIG['window_hours'])
+            query = db.session.query(Article.original_url, Article.content_simhash).filter(
+                Article.content_simhash.isnot(None),
+                Article.created_at >= cutoff_date,
+                # A story whose earlier copy failed (or was itself a duplicate) deserves another try
+                Article.status.in_(('pending', 'processing', 'batching', 'processed', 'published'))
+            )
+            if DEDUP_CONFIG['simhash_max_distance'] < SIMHASH_BANDS:
+                # Only rows sharing a band can be within the distance, found through the band indexes
+                query = query.filter(db.or_(*(
+                    getattr(Article, f'simhash_band{band}').in_({getattr(article, f'simhash_band{band}') for article in articles})
+                    for band in range(SIMHASH_BANDS)
+                )))
+            candidates = [(row.original_url, row.content_simhash) for row in query.all()]
+        except Exception as e:
+            logger.error(f"Error loading content fingerprints: {str(e)}")
+            candidates = []
+
+        for article in articles:
+            duplicate_of = find_near_duplicate(
+                article.content_simhash, candidates, DEDUP_CONFIG['simhash_max_distance']
+            )
+            if duplicate_of:
+                article.status = 'duplicate'
+                article.error_message = f'Near-duplicate of {duplicate_of}'
+                logger.info(f"Near-duplicate article skipped: {article.original_title}")
+            else:
+                candidates.append((article.original_url, article.content_simhash))
+
+    def _existing_urls(self, urls):
+        """Return the subset of urls already stored in the database (single IN query)"""
+        if not urls:
+            return set()
+        rows = db.session.query(Article.original_url).filter(Article.original_url.in_(urls)).all()
+        return {row.original_url for row in rows}
 
     def _extract_content(self, url):
         """Extract content from article URL"""
         try:
-            downloaded = trafilatura.fetch_url(url)
-            content = trafilatura.extract(downloaded)
-            return content[:5000] if content else None  # Limit content length
+            downloaded = self._download_html(url)
+            return self._parse(extract_article_text, downloaded)
         except Exception as e:
             logger.error(f"Error extracting content from {url}: {str(e)}")
             return None
 
+    def _parse(self, func, *args):
+        """Run a CPU-bound parser in the process pool (or inline when parse_workers is 0)"""
+        workers = SCHEDULE_CONFIG.get('parse_workers', 2)
+        if workers <= 0:
+            return func(*args)
+
+        with self._parse_pool_lock:
+            if self._parse_pool is None:
+                # Not fork: the scheduler and HTTP threads may hold locks that a forked child would inherit held
+                start_method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+                self._parse_pool = ProcessPoolExecutor(
+                    max_workers=workers, mp_context=multiprocessing.get_context(start_method)
+                )
+            pool = self._parse_pool
+
+        try:
+            return pool.submit(func, *args).result()
+        except BrokenProcessPool:
+            logger.warning("Parse process pool broke, recreating it on next use")
+            with self._parse_pool_lock:
+                if self._parse_pool is pool:
+                    self._parse_pool = None
+            return func(*args)
+
+    def _download_html(self, url):
+        """Get raw article HTML, reading the on-disk cache before the network"""
+        if self.html_cache:
+            cached = self.html_cache.get(url)
+            if cached is not None:
+                logger.debug(f"HTML cache hit: {url}")
+                return cached
+
+        downloaded = fetch_html(self.session, url)
+        if self.html_cache and downloaded:
+            self.html_cache.put(url, downloaded)
+        return downloaded
+
     def _extract_featured_image(self, entry):
         """Extract featured image from RSS entry"""
         try:
@@ -94,10 +515,7 @@ class RSSMonitor:
 
             # Method 3: Look in summary for img tags
             if not image_url and hasattr(entry, 'summary'):
-                soup = BeautifulSoup(entry.summary, 'html.parser')
-                img_tag = soup.find('img')
-                if img_tag and img_tag.get('src'):
-                    image_url = img_tag.get('src')
+                image_url = extract_summary_image(entry.summary)  # Cheap enough to run inline
 
             # Clean and validate URL
             if image_url:
@@ -110,8 +528,7 @@ class RSSMonitor:
                     image_url = f"{parsed.scheme}://{parsed.netloc}{image_url}"
 
                 # Validate image extensions
-                valid_extensions = ['.jpg', '.jpeg', '.png', '.webp', '.gif']
-                if any(ext in image_url.lower() for ext in valid_extensions):
+                if has_image_extension(image_url):
                     logger.info(f"Found featured image: {image_url}")
                     return image_url
 
@@ -122,21 +539,68 @@ class RSSMonitor:
             return None
 
     def cleanup_old_articles(self):
-        """Remove old processed articles to keep database clean"""
-        try:
-            cutoff_date = datetime.utcnow() - timedelta(hours=24)
-            old_articles = Article.query.filter(
-                Article.status.in_(['published', 'failed']),
-                Article.created_at < cutoff_date
-            ).all()
+        """Remove old processed articles to keep database clean.
 
+        Rows are deleted in bounded chunks by primary key, optionally streaming
+        each chunk into a gzip NDJSON archive first, so memory use does not grow
+        with the number of expired rows.
+        """
+        archive = None
+        archive_path = None
+        total = 0
+        try:
             with app.app_context():  # Garantindo que o código está no contexto da aplicação
-                for article in old_articles:
-                    db.session.delete(article)
+                cutoff_date = datetime.utcnow() - timedelta(hours=CLEANUP_CONFIG['retention_hours'])
+                # Full rows (with the large text columns) only when they are archived
+                columns = Article.__table__.columns if CLEANUP_CONFIG['archive_enabled'] else [Article.id]
+                last_id = 0
+
+                while True:
+                    rows = db.session.query(*columns).filter(
+                        Article.status.in_(['published', 'failed', 'duplicate']),
+                        Article.created_at < cutoff_date,
+                        Article.id > last_id
+                    ).order_by(Article.id).limit(CLEANUP_CONFIG['chunk_size']).all()
+                    if not rows:
+                        break
+
+                    if CLEANUP_CONFIG['archive_enabled']:
+                        if archive is None:
+                            archive_path = self._cleanup_archive_path()
+                            archive = gzip.open(archive_path, 'wt', encoding='utf-8')
+                        for row in rows:
+                            archive.write(json.dumps(self._row_to_dict(row), ensure_ascii=False) + '\n')
+                        archive.flush()
 
-                db.session.commit()
-            logger.info(f"Cleaned up {len(old_articles)} old articles")
+                    ids = [row.id for row in rows]
+                    # Keep the audit trail, just detach it from the deleted articles
+                    ProcessingLog.query.filter(ProcessingLog.article_id.in_(ids)).update(
+                        {ProcessingLog.article_id: None}, synchronize_session=False
+                    )
+                    Article.query.filter(Article.id.in_(ids)).delete(synchronize_session=False)
+                    db.session.commit()
+
+                    total += len(ids)
+                    last_id = ids[-1]
+
+            if archive_path:
+                logger.info(f"Archived {total} old articles to {archive_path}")
+            logger.info(f"Cleaned up {total} old articles")
 
         except Exception as e:
             logger.error(f"Error cleaning up old articles: {str(e)}")
             db.session.rollback()
+        finally:
+            if archive is not None:
+                archive.close()
+
+    def _cleanup_archive_path(self):
+        os.makedirs(CLEANUP_CONFIG['archive_dir'], exist_ok=True)
+        filename = f"articles-{datetime.utcnow().strftime('%Y%m%d-%H%M%S')}.ndjson.gz"
+        return os.path.join(CLEANUP_CONFIG['archive_dir'], filename)
+
+    def _row_to_dict(self, row):
+        return {
+            key: value.isoformat() if isinstance(value, datetime) else value
+            for key, value in row._mapping.items()
+        }
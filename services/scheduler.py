@@ -1,10 +1,11 @@
 import logging
+from datetime import datetime, timedelta
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.interval import IntervalTrigger
 from services.rss_monitor import RSSMonitor
 from services.ai_processor import AIProcessor
 from services.wordpress_publisher import WordPressPublisher
-from config import SCHEDULE_CONFIG
+from config import SCHEDULE_CONFIG, WEBSUB_CONFIG, AI_CONFIG
 
 logger = logging.getLogger(__name__)
 
@@ -19,6 +20,18 @@ class ContentAutomationScheduler:
     def start(self):
         """Start the automation scheduler"""
         if not self.is_running:
+            self.rss_monitor.warm_seen_filter()
+            self.ai_processor.requeue_interrupted_articles()
+
+            self.scheduler.add_job(
+                func=self.feed_polling_cycle,
+                # Each feed has its own adaptive interval; the tick only polls the ones that are due
+                trigger=IntervalTrigger(minutes=SCHEDULE_CONFIG['poll_tick']),
+                id='feed_polling',
+                name='Feed Polling',
+                replace_existing=True
+            )
+
             self.scheduler.add_job(
                 func=self.automation_cycle,
                 trigger=IntervalTrigger(minutes=SCHEDULE_CONFIG['check_interval']),
@@ -35,6 +48,16 @@ class ContentAutomationScheduler:
                 replace_existing=True
             )
 
+            if WEBSUB_CONFIG['enabled']:
+                self.scheduler.add_job(
+                    func=self.rss_monitor.renew_websub_subscriptions,
+                    trigger=IntervalTrigger(hours=1),
+                    id='websub_renewal',
+                    name='WebSub Subscription Renewal',
+                    next_run_time=datetime.now() + timedelta(minutes=2),  # After the first polls discover hubs
+                    replace_existing=True
+                )
+
             self.scheduler.start()
             self.is_running = True
             logger.info("Content automation scheduler started")
@@ -43,32 +66,47 @@ class ContentAutomationScheduler:
         """Stop the automation scheduler"""
         if self.is_running:
             self.scheduler.shutdown(wait=False)
+            self.rss_monitor.shutdown()
+            self.ai_processor.shutdown()
             self.is_running = False
             logger.info("Content automation scheduler stopped")
 
+    def feed_polling_cycle(self):
+        """Poll the feeds whose adaptive interval is due"""
+        from app import app
+        with app.app_context():
+            try:
+                new_articles = self.rss_monitor.fetch_new_articles(due_only=True)
+                if new_articles:
+                    logger.info(f"Feed polling found {new_articles} new articles")
+            except Exception as e:
+                logger.error(f"Error in feed polling: {str(e)}", exc_info=True)
+
     def automation_cycle(self):
-        """Main automation cycle"""
+        """Main automation cycle: AI processing and publishing (feeds are polled by feed_polling_cycle)"""
         from app import app
         with app.app_context():
             try:
                 logger.info("=== Starting automation cycle ===")
-                logger.info("Step 1: Fetching new articles...")
-                new_articles = self.rss_monitor.fetch_new_articles()
-                logger.info(f"Found {new_articles} new articles")
-
-                logger.info("Step 2: Processing articles with AI...")
-                processed = self.ai_processor.process_pending_articles(
+                logger.info("Step 1: Processing articles with AI...")
+                processed = 0
+                if AI_CONFIG['batch']['enabled']:
+                    processed += self.ai_processor.poll_batches()
+                    submitted = self.ai_processor.submit_batches()
+                    if submitted:
+                        logger.info(f"Submitted {submitted} articles as batch jobs")
+                processed += self.ai_processor.process_pending_articles(
                     max_articles=SCHEDULE_CONFIG['max_articles_per_run']
                 )
                 logger.info(f"Processed {processed} articles")
 
-                logger.info("Step 3: Publishing to WordPress...")
+                logger.info("Step 2: Publishing to WordPress...")
                 published = self.wordpress_publisher.publish_processed_articles(
                     max_articles=SCHEDULE_CONFIG['max_articles_per_run']
                 )
                 logger.info(f"Published {published} articles")
 
-                logger.info(f"=== Cycle completed: {new_articles} new, {processed} processed, {published} published ===")
+                logger.info(f"=== Cycle completed: {processed} processed, {published} published ===")
             except Exception as e:
                 logger.error(f"Error in automation cycle: {str(e)}", exc_info=True)
 
@@ -88,6 +126,11 @@ class ContentAutomationScheduler:
         from app import app
         logger.info("Manual execution triggered")
         with app.app_context():
+            try:
+                new_articles = self.rss_monitor.fetch_new_articles(due_only=False)
+                logger.info(f"Found {new_articles} new articles")
+            except Exception as e:
+                logger.error(f"Error fetching feeds: {str(e)}", exc_info=True)
             self.automation_cycle()
 
     def get_status(self):
@@ -0,0 +1,37 @@
+import logging
+from sqlalchemy import inspect, text
+from app import db
+
+logger = logging.getLogger(__name__)
+
+
+def add_missing_columns():
+    """Add model columns (and their indexes) that are missing from existing tables.
+
+    db.create_all() only creates tables that do not exist yet, so columns added
+    to a model later never reach an already deployed database. New columns are
+    added as nullable; the code treats NULL like the column default.
+    Returns the list of "table.column" names added.
+    """
+    inspector = inspect(db.engine)
+    existing_tables = set(inspector.get_table_names())
+    added = []
+
+    with db.engine.begin() as connection:
+        for table in db.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+            existing_columns = {column['name'] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing_columns:
+                    continue
+                column_type = column.type.compile(dialect=db.engine.dialect)
+                connection.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}'))
+                added.append(f"{table.name}.{column.name}")
+                logger.info(f"Added column {table.name}.{column.name} ({column_type})")
+
+            for index in table.indexes:
+                if any(column.name not in existing_columns for column in index.columns):
+                    index.create(connection, checkfirst=True)
+
+    return added
@@ -0,0 +1,54 @@
+import threading
+from collections import OrderedDict
+
+
+class SeenUrlFilter:
+    """Process-local bounded LRU set of recently seen article URLs.
+
+    A hit means the URL is already stored, so no database query is needed.
+    A miss only means the URL was not seen recently; the database remains
+    the authority for those.
+    """
+
+    def __init__(self, max_size=5000):
+        self.max_size = max_size
+        self._urls = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __contains__(self, url):
+        with self._lock:
+            return url in self._urls
+
+    def __len__(self):
+        with self._lock:
+            return len(self._urls)
+
+    def add(self, url):
+        self.update([url])
+
+    def update(self, urls):
+        with self._lock:
+            for url in urls:
+                self._urls[url] = None
+                self._urls.move_to_end(url)
+            while len(self._urls) > self.max_size:
+                self._urls.popitem(last=False)
+
+    def unseen(self, urls):
+        """Return the URLs not present in the filter, refreshing the ones that are"""
+        unseen = set()
+        with self._lock:
+            for url in urls:
+                if url in self._urls:
+                    self._urls.move_to_end(url)
+                    self.hits += 1
+                else:
+                    unseen.add(url)
+                    self.misses += 1
+        return unseen
+
+    def clear(self):
+        with self._lock:
+            self._urls.clear()
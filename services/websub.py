@@ -0,0 +1,120 @@
+import hashlib
+import hmac
+import logging
+from datetime import datetime, timedelta
+from urllib.parse import urlparse
+from app import db
+from config import WEBSUB_CONFIG
+
+logger = logging.getLogger(__name__)
+
+
+def discover_links(feed):
+    """Return (hub_url, self_url) advertised by a parsed feed, if any"""
+    hub_url = None
+    self_url = None
+    for link in feed.get('feed', {}).get('links', []):
+        rel = link.get('rel')
+        if rel == 'hub' and not hub_url:
+            hub_url = link.get('href')
+        elif rel == 'self' and not self_url:
+            self_url = link.get('href')
+    return hub_url, self_url
+
+
+def callback_url(feed_type):
+    return f"{WEBSUB_CONFIG['callback_base_url'].rstrip('/')}/websub/{feed_type}"
+
+
+def is_subscribed(feed):
+    return bool(feed.websub_expires_at and feed.websub_expires_at > datetime.utcnow())
+
+
+def _pending(feed):
+    return bool(feed.websub_pending_mode and feed.websub_requested_at
+                and datetime.utcnow() - feed.websub_requested_at < timedelta(seconds=WEBSUB_CONFIG['verify_timeout']))
+
+
+def needs_renewal(feed):
+    """A feed with a hub needs a (re)subscription when it has none or it expires within a day"""
+    if not feed.hub_url or _pending(feed):
+        return False
+    return not feed.websub_expires_at or feed.websub_expires_at - datetime.utcnow() < timedelta(days=1)
+
+
+def request_subscription(session, feed, mode='subscribe'):
+    """Send a subscription request to the feed's hub; the hub verifies it asynchronously.
+
+    The request is recorded on the feed first (the hub may verify before it
+    answers), so only a verification matching it is accepted.
+    """
+    data = {
+        'hub.mode': mode,
+        'hub.topic': feed.topic_url or feed.url,
+        'hub.callback': callback_url(feed.feed_type),
+        'hub.lease_seconds': WEBSUB_CONFIG['lease_seconds']
+    }
+    if WEBSUB_CONFIG['secret']:
+        data['hub.secret'] = WEBSUB_CONFIG['secret']
+
+    feed.websub_pending_mode = mode
+    feed.websub_requested_at = datetime.utcnow()
+    db.session.commit()
+
+    try:
+        response = session.post(feed.hub_url, data=data, timeout=15)
+        if response.status_code not in (202, 204):
+            raise Exception(f"Hub rejected {mode} request: {response.status_code} - {response.text[:200]}")
+    except Exception:
+        feed.websub_pending_mode = None
+        feed.websub_requested_at = None
+        db.session.commit()
+        raise
+    logger.info(f"WebSub {mode} request accepted for {feed.feed_type} by {feed.hub_url}")
+
+
+def accept_verification(feed, mode, lease_seconds=None):
+    """Apply the hub's verification of intent if it answers our pending request; returns whether it did.
+
+    The lease is capped at the one we asked for.
+    """
+    pending_mode = 'subscribe' if mode == 'denied' else mode
+    if not _pending(feed) or feed.websub_pending_mode != pending_mode:
+        return False
+
+    if mode == 'subscribe':
+        lease_seconds = min(lease_seconds or WEBSUB_CONFIG['lease_seconds'], WEBSUB_CONFIG['lease_seconds'])
+        feed.websub_expires_at = datetime.utcnow() + timedelta(seconds=lease_seconds)
+    else:
+        feed.websub_expires_at = None
+    feed.websub_pending_mode = None
+    feed.websub_requested_at = None
+    return True
+
+
+def push_enabled():
+    """Pushes are only accepted when WebSub is on and a secret lets us authenticate them"""
+    return WEBSUB_CONFIG['enabled'] and bool(WEBSUB_CONFIG['secret'])
+
+
+def same_host(url, feed_url):
+    """Whether url is served by the feed's site (ignoring a leading www.)"""
+    def host(value):
+        netloc = (urlparse(value or '').hostname or '').lower()
+        return netloc[4:] if netloc.startswith('www.') else netloc
+    return bool(host(url)) and host(url) == host(feed_url)
+
+
+def verify_signature(body, signature_header):
+    """Check the X-Hub-Signature of a pushed payload (never valid without a configured secret)"""
+    secret = WEBSUB_CONFIG['secret']
+    if not secret:
+        return False
+    if not signature_header or '=' not in signature_header:
+        return False
+
+    method, signature = signature_header.split('=', 1)
+    if method not in ('sha1', 'sha256', 'sha384', 'sha512'):
+        return False
+    expected = hmac.new(secret.encode('utf-8'), body, getattr(hashlib, method)).hexdigest()
+    return hmac.compare_digest(expected, signature)
@@ -331,9 +331,11 @@ function formatStatus(status) {
     const statusMap = {
         'pending': { class: 'secondary', text: 'Pendente' },
         'processing': { class: 'warning', text: 'Processando' },
+        'batching': { class: 'info', text: 'Em lote' },
         'processed': { class: 'info', text: 'Processado' },
         'published': { class: 'success', text: 'Publicado' },
-        'failed': { class: 'danger', text: 'Falhou' }
+        'failed': { class: 'danger', text: 'Falhou' },
+        'duplicate': { class: 'dark', text: 'Duplicado' }
     };
     
     const statusInfo = statusMap[status] || { class: 'secondary', text: status };
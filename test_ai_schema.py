@@ -0,0 +1,28 @@
+import json
+import pytest
+from pydantic import ValidationError
+from services.ai_schema import parse_article_rewrites
+
+REWRITE = {
+    'titulo_final': 'Título', 'conteudo_final': '<p>Texto</p>', 'meta_description': 'Meta',
+    'focus_keyword': 'keyword', 'categoria': 'Filmes', 'obra_principal': 'Obra', 'tags': ['tag']
+}
+
+
+def test_packed_rewrites_are_matched_by_article_number():
+    """As reescritas voltam na ordem dos artigos, mesmo que o modelo as embaralhe."""
+    text = json.dumps([dict(REWRITE, artigo=2, titulo_final='B'), dict(REWRITE, artigo=1, titulo_final='A')])
+
+    rewrites = parse_article_rewrites(text, 2)
+
+    assert [rewrite['titulo_final'] for rewrite in rewrites] == ['A', 'B']
+    assert 'artigo' not in rewrites[0]
+
+
+@pytest.mark.parametrize('numbers', [[1, 1], [1], [1, 3], [1, 2, 3]])
+def test_packed_rewrites_with_wrong_article_numbers_are_rejected(numbers):
+    """Números repetidos, faltando ou desconhecidos invalidam o pacote inteiro."""
+    text = json.dumps([dict(REWRITE, artigo=number) for number in numbers])
+
+    with pytest.raises(ValidationError):
+        parse_article_rewrites(text, 2)
@@ -0,0 +1,98 @@
+import json
+
+import pytest
+
+# O banco SQLite temporário é configurado em conftest.py, antes do primeiro import da app
+from app import app, db
+from config import AI_CONFIG
+from models import Article
+from services.ai_processor import AIProcessor
+from services.batch_backend import FAILED
+
+REWRITE = {
+    'titulo_final': 'Título reescrito', 'conteudo_final': 'Texto reescrito.', 'meta_description': 'Meta',
+    'focus_keyword': 'keyword', 'categoria': 'Filmes', 'obra_principal': 'Obra', 'tags': ['tag']
+}
+
+
+@pytest.fixture
+def processor(monkeypatch):
+    """AIProcessor com o backend de lote 'fake', montado pela mesma fábrica do backend real."""
+    monkeypatch.setitem(AI_CONFIG['batch'], 'backend', 'fake')
+    monkeypatch.setitem(AI_CONFIG['batch'], 'min_articles', 1)
+    with app.app_context():
+        db.create_all()
+
+    processor = AIProcessor()
+    monkeypatch.setattr(processor, 'clients', {'cinema_primary': object()})
+    monkeypatch.setattr(processor, 'response_cache', None)
+    # Guarda as chaves e backends reais para o monkeypatch restaurar ao final
+    monkeypatch.setattr(processor, 'key_pool', processor.key_pool)
+    monkeypatch.setattr(processor, 'batch_backends', processor.batch_backends)
+    processor._build_key_pool()
+    processor._build_batch_backends()
+    yield processor
+
+    with app.app_context():
+        Article.query.delete()
+        db.session.commit()
+        db.session.remove()
+
+
+def add_articles(*titles):
+    with app.app_context():
+        for title in titles:
+            db.session.add(Article(original_url=f"https://example.com/{title}", original_title=title,
+                                   original_content=f"Conteúdo de {title}.", feed_type='movies'))
+        db.session.commit()
+
+
+def statuses():
+    with app.app_context():
+        return {article.original_title: article.status for article in Article.query.all()}
+
+
+def test_batch_results_are_applied_to_articles(processor):
+    """Um lote bem-sucedido marca todos os artigos como processados."""
+    backend = processor.batch_backends['cinema_primary']
+    backend.respond = lambda prompt: json.dumps(REWRITE)
+    backend.polls_to_finish = 2
+    add_articles('a1', 'a2', 'a3')
+
+    assert processor.submit_batches() == 3
+    assert set(statuses().values()) == {'batching'}
+
+    assert processor.poll_batches() == 0  # job ainda em execução
+    assert processor.poll_batches() == 3
+    assert set(statuses().values()) == {'processed'}
+
+
+def test_failed_batch_requeues_articles(processor):
+    """Um job que falha devolve os artigos para a fila normal."""
+    processor.batch_backends['cinema_primary'].final_state = FAILED
+    add_articles('b1', 'b2')
+
+    processor.submit_batches()
+
+    assert processor.poll_batches() == 0
+    assert set(statuses().values()) == {'pending'}
+    with app.app_context():
+        assert all(article.batch_job is None for article in Article.query.all())
+
+
+def test_invalid_batch_items_are_marked_failed(processor):
+    """Itens sem resposta ou fora do schema falham sem afetar os demais."""
+    def respond(prompt):
+        if 'c2' in prompt:
+            return json.dumps({'titulo_final': 'sem os outros campos'})
+        if 'c3' in prompt:
+            return None
+        return json.dumps(REWRITE)
+
+    processor.batch_backends['cinema_primary'].respond = respond
+    add_articles('c1', 'c2', 'c3')
+
+    processor.submit_batches()
+
+    assert processor.poll_batches() == 1
+    assert statuses() == {'c1': 'processed', 'c2': 'failed', 'c3': 'failed'}
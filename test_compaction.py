@@ -0,0 +1,31 @@
+from services.compaction import compact_text, estimate_tokens
+
+ARTICLE = """Marvel Studios confirmed the next Avengers movie will film in London.   It starts this summer.
+
+Related: Every upcoming Marvel movie
+Image via Marvel Studios
+The director said the story picks up years later. Several cast members return.
+Subscribe to our newsletter for the latest news.
+Thanks for reading!
+Thanks for reading!"""
+
+
+def test_boilerplate_and_whitespace_are_removed():
+    """Linhas de boilerplate e repetidas somem; o conteúdo da notícia fica."""
+    compacted = compact_text(ARTICLE, 1000)
+
+    assert 'Related:' not in compacted
+    assert 'Image via' not in compacted
+    assert 'newsletter' not in compacted
+    assert compacted.count('Thanks for reading!') == 1
+    assert 'London. It starts' in compacted
+    assert estimate_tokens(compacted) < estimate_tokens(ARTICLE)
+
+
+def test_truncation_keeps_whole_sentences():
+    """O corte respeita o orçamento de tokens e termina em fim de frase."""
+    compacted = compact_text(ARTICLE, 20)
+
+    assert estimate_tokens(compacted) <= 20
+    assert compacted.endswith('.')
+    assert compacted.startswith('Marvel Studios confirmed')
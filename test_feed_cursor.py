@@ -0,0 +1,96 @@
+import time
+from datetime import datetime
+from types import SimpleNamespace
+from feedparser import FeedParserDict
+from services.feed_cursor import select_entries, plan_rewind
+
+
+def make_entry(number):
+    """Entrada com data crescente: e1 é a mais antiga."""
+    return FeedParserDict(
+        id=f"e{number}", link=f"https://example.com/e{number}",
+        published_parsed=time.gmtime(1700000000 + number * 60)
+    )
+
+
+def make_state():
+    return SimpleNamespace(last_entry_published_at=None, last_entry_id=None,
+                           backlog_pending=False, entry_retries=None)
+
+
+def test_cursor_only_moves_forward_and_drains_backlog():
+    """Cada ciclo pega as próximas entradas após o cursor, das mais antigas para as mais novas."""
+    state = make_state()
+    feed = [make_entry(n) for n in range(1, 4)]
+    selected, _ = select_entries(state, list(reversed(feed)), batch_size=3, first_poll_size=3)
+    assert [entry.id for entry, _ in selected] == ['e1', 'e2', 'e3']
+
+    feed = [make_entry(n) for n in range(1, 9)]
+    selected, newer = select_entries(state, list(reversed(feed)), batch_size=3, first_poll_size=3)
+    assert newer == 5 and state.backlog_pending
+    assert [entry.id for entry, _ in selected] == ['e4', 'e5', 'e6']
+
+    selected, _ = select_entries(state, list(reversed(feed)), batch_size=3, first_poll_size=3)
+    assert [entry.id for entry, _ in selected] == ['e7', 'e8']
+    assert not state.backlog_pending
+
+
+def test_permanently_failing_entry_does_not_block_the_feed():
+    """Uma entrada que nunca extrai é pulada após max_retries e as seguintes seguem."""
+    state = make_state()
+    state.last_entry_id = 'e0'
+    state.last_entry_published_at = datetime(*time.gmtime(1700000000)[:6])
+    feed = list(reversed([make_entry(n) for n in range(1, 21)]))
+    processed = set()
+
+    for _ in range(10):
+        batch_size = 10 if state.backlog_pending else 3
+        selected, _ = select_entries(state, feed, batch_size=batch_size, first_poll_size=3)
+        failures = [(previous, entry.id) for entry, previous in selected if entry.id == 'e1']
+        processed.update(entry.id for entry, _ in selected if entry.id != 'e1')
+        cursor, skipped = plan_rewind(state, failures, max_retries=3)
+        if cursor is not None:
+            state.last_entry_published_at, state.last_entry_id = cursor
+            state.backlog_pending = True
+
+    assert processed == {f"e{n}" for n in range(2, 21)}
+    assert not state.backlog_pending
+    assert state.entry_retries is None
+
+
+def test_future_dated_entry_waits_until_it_is_due():
+    """Entrada com data futura não move o cursor e só é selecionada quando a data chega."""
+    state = make_state()
+    state.last_entry_published_at = datetime(*time.gmtime(1700000000)[:6])
+    state.last_entry_id = 'e0'
+    future = FeedParserDict(id='x', link='https://example.com/x', published_parsed=time.gmtime(1700000000 + 3600))
+    feed = [future, make_entry(1)]
+    now = datetime(*time.gmtime(1700000000 + 600)[:6])
+
+    selected, newer = select_entries(state, feed, batch_size=3, first_poll_size=3, now=now)
+    assert [entry.id for entry, _ in selected] == ['e1'] and newer == 1
+
+    selected, newer = select_entries(state, feed, batch_size=3, first_poll_size=3, now=now)
+    assert selected == [] and newer == 0
+
+    later = datetime(*time.gmtime(1700000000 + 7200)[:6])
+    selected, _ = select_entries(state, feed, batch_size=3, first_poll_size=3, now=later)
+    assert [entry.id for entry, _ in selected] == ['x']
+
+
+def test_entries_sharing_a_timestamp_are_selected_once():
+    """Entradas com o mesmo horário do cursor não voltam a ser selecionadas."""
+    state = make_state()
+    state.last_entry_published_at = datetime(*time.gmtime(1700000000)[:6])
+    state.last_entry_id = 'e0'
+    same_time = time.gmtime(1700000060)
+    feed = [FeedParserDict(id=f"s{n}", link=f"https://example.com/s{n}", published_parsed=same_time) for n in (2, 1, 3)]
+
+    selected, newer = select_entries(state, feed, batch_size=2, first_poll_size=3)
+    assert [entry.id for entry, _ in selected] == ['s1', 's2'] and newer == 3
+
+    selected, newer = select_entries(state, feed, batch_size=2, first_poll_size=3)
+    assert [entry.id for entry, _ in selected] == ['s3'] and newer == 1
+
+    selected, newer = select_entries(state, feed, batch_size=2, first_poll_size=3)
+    assert selected == [] and newer == 0
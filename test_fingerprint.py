@@ -0,0 +1,34 @@
+from services.fingerprint import simhash, simhash_bands, hamming_distance, find_near_duplicate
+
+ARTICLE = (
+    "Marvel Studios has confirmed that the next Avengers movie will begin filming in London "
+    "this summer, with several returning cast members expected to reprise their roles. "
+    "The studio also revealed new details about the release window and the director."
+)
+
+
+def test_simhash_is_stable_and_signed_64_bit():
+    """O mesmo texto sempre gera a mesma assinatura, dentro do intervalo de um BIGINT."""
+    value = simhash(ARTICLE)
+    assert value == simhash(ARTICLE)
+    assert -(1 << 63) <= value < (1 << 63)
+
+
+def test_near_identical_texts_are_detected():
+    """Pequenas alterações mantêm a distância baixa; textos diferentes ficam distantes."""
+    edited = ARTICLE.replace("this summer", "this coming summer")
+    other = "Netflix renewed its fantasy series for a third season after record viewership numbers."
+
+    assert hamming_distance(simhash(ARTICLE), simhash(edited)) < hamming_distance(simhash(ARTICLE), simhash(other))
+    assert find_near_duplicate(simhash(ARTICLE), [('a', simhash(other)), ('b', simhash(ARTICLE))]) == 'b'
+    assert find_near_duplicate(simhash(ARTICLE), [('a', simhash(other))]) is None
+
+
+def test_near_duplicates_share_a_band():
+    """Assinaturas a até 3 bits de distância têm ao menos uma faixa igual (busca pelos índices)."""
+    signature = simhash(ARTICLE)
+    for flipped in ([0, 20, 40], [1, 2, 3], [15, 31, 63]):
+        other = signature
+        for bit in flipped:
+            other ^= 1 << bit
+        assert any(a == b for a, b in zip(simhash_bands(signature), simhash_bands(other)))